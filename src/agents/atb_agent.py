@@ -4,15 +4,35 @@ src/agents/atb_agent.py
 aTB Agent: Cache management and status tracking for aTB computations.
 """
 
-import json
+import functools
+import hashlib
+import os
+import re
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, Any
 
+from src.utils.fs import ensure_dir, write_if_changed
+from src.utils.jsonio import read_json, write_json_atomic
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Cache layout versions:
+# 1: cache/atb/{inchikey[:2]}/{inchikey}/ (skewed: InChIKey prefixes cluster)
+# 2: cache/atb/{blake2b(inchikey, 1 byte hex)}/{inchikey}/ (uniform 256-way)
+# The current layout version is recorded in {cache_dir}/layout_version.
+CACHE_LAYOUT_VERSION = 2
+
+# Old v1 shard directories are two uppercase InChIKey characters; v2 shards
+# are two lowercase hex characters, so the namespaces never collide.
+_V1_SHARD_RE = re.compile(r"^[A-Z]{2}$")
+
+
+def _shard_prefix(inchikey: str) -> str:
+    """Uniform 256-way shard prefix (2 hex chars) for an InChIKey."""
+    return hashlib.blake2b(inchikey.encode(), digest_size=1).hexdigest()
+
 
 class ATBAgent:
     """Agent for aTB cache management and status tracking."""
@@ -25,13 +45,32 @@ class ATBAgent:
             cache_dir: Base directory for aTB cache (default: "cache/atb")
         """
         self.cache_dir = Path(cache_dir)
+        # Pre-joined string form for hot-path probes: plain string
+        # concatenation + os.path avoids per-call Path allocations.
+        self._cache_dir_str = str(self.cache_dir)
+        # Positive-only cache of InChIKeys whose status.json this process
+        # has already seen (or written): repeated check_cache probes skip
+        # the stat syscall. Misses are never cached — another worker may
+        # create the entry between probes.
+        self._known_cached: set = set()
+        # Directories this process has already created (mol dirs and
+        # their shard prefixes): repeated mark_pending calls skip the
+        # mkdir syscalls entirely.
+        self._dirs_created: set = set()
+
+    def _mol_dir_str(self, inchikey: str) -> str:
+        """Cache directory for an InChIKey as a pre-joined string (hot path)."""
+        if not inchikey or len(inchikey) < 2:
+            raise ValueError(f"Invalid InChIKey: {inchikey}")
+        return f"{self._cache_dir_str}{os.sep}{_shard_prefix(inchikey)}{os.sep}{inchikey}"
 
     def get_cache_path(self, inchikey: str) -> Path:
         """
         Get cache directory path for a given InChIKey.
 
-        Uses 2-character prefix for filesystem efficiency:
-        cache/atb/{inchikey[:2]}/{inchikey}/
+        Shards by a 1-byte BLAKE2b hash of the InChIKey for uniform
+        256-way fan-out (InChIKey first characters are heavily skewed):
+        cache/atb/{hash_prefix}/{inchikey}/
 
         Args:
             inchikey: InChIKey string
@@ -39,12 +78,51 @@ class ATBAgent:
         Returns:
             Path to cache directory
         """
-        if not inchikey or len(inchikey) < 2:
-            raise ValueError(f"Invalid InChIKey: {inchikey}")
+        return Path(self._mol_dir_str(inchikey))
+
+    def migrate_layout(self) -> Dict[str, int]:
+        """
+        One-shot migration from layout v1 (inchikey[:2] shards) to v2
+        (BLAKE2b hash shards).
 
-        prefix = inchikey[:2]
-        cache_path = self.cache_dir / prefix / inchikey
-        return cache_path
+        Renames each molecule directory into its hashed shard, removes
+        emptied v1 shard directories, and records the layout version in
+        {cache_dir}/layout_version.
+
+        Returns:
+            Dict with migrated/skipped counts
+        """
+        migrated = 0
+        skipped = 0
+
+        if self.cache_dir.exists():
+            for shard_dir in sorted(self.cache_dir.iterdir()):
+                if not shard_dir.is_dir() or not _V1_SHARD_RE.match(shard_dir.name):
+                    continue
+
+                for mol_dir in sorted(shard_dir.iterdir()):
+                    if not mol_dir.is_dir():
+                        continue
+                    target = self.get_cache_path(mol_dir.name)
+                    if target.exists():
+                        logger.warning(f"Migration target already exists, skipping: {target}")
+                        skipped += 1
+                        continue
+                    ensure_dir(target.parent)
+                    mol_dir.rename(target)
+                    migrated += 1
+
+                # Drop the shard dir if emptied
+                try:
+                    shard_dir.rmdir()
+                except OSError:
+                    pass
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        (self.cache_dir / "layout_version").write_text(f"{CACHE_LAYOUT_VERSION}\n")
+
+        logger.info(f"Cache layout migration complete: {migrated} migrated, {skipped} skipped")
+        return {"migrated": migrated, "skipped": skipped}
 
     def check_cache(self, inchikey: str) -> bool:
         """
@@ -58,13 +136,57 @@ class ATBAgent:
         Returns:
             True if cache exists, False otherwise
         """
-        cache_path = self.get_cache_path(inchikey)
-        status_file = cache_path / "status.json"
-        exists = status_file.exists()
+        if inchikey in self._known_cached:
+            logger.debug(f"Cache check for {inchikey}: hit (memoized)")
+            return True
+
+        exists = os.path.isfile(f"{self._mol_dir_str(inchikey)}{os.sep}status.json")
+        if exists:
+            self._known_cached.add(inchikey)
 
         logger.debug(f"Cache check for {inchikey}: {'hit' if exists else 'miss'}")
         return exists
 
+    def check_cache_bulk(self, inchikeys) -> set:
+        """
+        Check cache existence for many InChIKeys with one scandir per shard.
+
+        Groups keys by shard prefix and lists each shard directory once,
+        so the syscall count is ~(#shards + #cached) instead of one stat
+        per InChIKey.
+
+        Args:
+            inchikeys: Iterable of InChIKey strings
+
+        Returns:
+            Set of InChIKeys that have a cached status.json
+        """
+        cached = set()
+        by_shard: Dict[str, list] = {}
+        for inchikey in inchikeys:
+            if not inchikey or len(inchikey) < 2:
+                continue
+            if inchikey in self._known_cached:
+                cached.add(inchikey)
+                continue
+            by_shard.setdefault(_shard_prefix(inchikey), []).append(inchikey)
+        for prefix, keys in by_shard.items():
+            shard_dir = f"{self._cache_dir_str}{os.sep}{prefix}"
+            try:
+                present = {e.name for e in os.scandir(shard_dir) if e.is_dir()}
+            except FileNotFoundError:
+                continue
+
+            for inchikey in keys:
+                if inchikey in present and os.path.isfile(
+                    f"{shard_dir}{os.sep}{inchikey}{os.sep}status.json"
+                ):
+                    cached.add(inchikey)
+                    self._known_cached.add(inchikey)
+
+        logger.debug(f"Bulk cache check: {len(cached)} hits")
+        return cached
+
     def load_status(self, inchikey: str) -> Optional[Dict[str, Any]]:
         """
         Load status.json from cache.
@@ -79,14 +201,12 @@ class ATBAgent:
             FileNotFoundError: If cache doesn't exist
             json.JSONDecodeError: If status.json is malformed
         """
-        cache_path = self.get_cache_path(inchikey)
-        status_file = cache_path / "status.json"
+        status_file = f"{self._mol_dir_str(inchikey)}{os.sep}status.json"
 
-        if not status_file.exists():
+        if not os.path.isfile(status_file):
             raise FileNotFoundError(f"status.json not found for {inchikey} at {status_file}")
 
-        with open(status_file, "r") as f:
-            status = json.load(f)
+        status = read_json(status_file)
 
         logger.info(f"Loaded status for {inchikey}: run_status={status.get('run_status', 'unknown')}")
         return status
@@ -109,10 +229,30 @@ class ATBAgent:
             Path to created status.json
         """
         cache_path = self.get_cache_path(inchikey)
-        cache_path.mkdir(parents=True, exist_ok=True)
+        mol_dir = str(cache_path)
+        if mol_dir not in self._dirs_created:
+            ensure_dir(cache_path)
+            self._dirs_created.add(mol_dir)
 
         status_file = cache_path / "status.json"
 
+        # Coalesce redundant writes: re-marking an already-pending
+        # molecule (batch restarts re-walk the input list) is a no-op
+        # instead of a fresh serialize + atomic replace. Only a pending
+        # status is skipped — never clobber or preserve-over a real run
+        # result here.
+        if os.path.isfile(status_file):
+            try:
+                existing = read_json(status_file)
+            except ValueError:
+                existing = None
+            if existing is not None and existing.get("run_status") == "pending":
+                self._known_cached.add(inchikey)
+                if smiles:
+                    write_if_changed(cache_path / "canonical_smiles.txt", smiles.encode())
+                logger.debug(f"Pending status already present for {inchikey}; skipping rewrite")
+                return status_file
+
         # Create placeholder status - STRICT SCHEMA COMPLIANCE
         # Only include fields defined in doc/process.md P2 status.json schema
         status = {
@@ -125,14 +265,15 @@ class ATBAgent:
             "runtime_sec": None
         }
 
-        with open(status_file, "w") as f:
-            json.dump(status, f, indent=2)
+        # Atomic write: concurrent load_status callers must never see a
+        # half-written status.json.
+        write_json_atomic(status_file, status)
+
+        self._known_cached.add(inchikey)
 
         # Optionally store SMILES separately for reference (not in status.json schema)
         if smiles:
-            smiles_file = cache_path / "canonical_smiles.txt"
-            with open(smiles_file, "w") as f:
-                f.write(smiles)
+            write_if_changed(cache_path / "canonical_smiles.txt", smiles.encode())
 
         logger.info(f"Created pending status for {inchikey} at {status_file}")
         return status_file
@@ -147,15 +288,13 @@ class ATBAgent:
         Returns:
             Features dictionary, or None if not found
         """
-        cache_path = self.get_cache_path(inchikey)
-        features_file = cache_path / "features.json"
+        features_file = f"{self._mol_dir_str(inchikey)}{os.sep}features.json"
 
-        if not features_file.exists():
+        if not os.path.isfile(features_file):
             logger.debug(f"features.json not found for {inchikey}")
             return None
 
-        with open(features_file, "r") as f:
-            features = json.load(f)
+        features = read_json(features_file)
 
         logger.info(f"Loaded features for {inchikey}")
         return features
@@ -170,18 +309,18 @@ class ATBAgent:
         Returns:
             Dictionary with cache status, paths, and available files
         """
-        cache_path = self.get_cache_path(inchikey)
-        status_file = cache_path / "status.json"
-        features_file = cache_path / "features.json"
+        cache_path = self._mol_dir_str(inchikey)
+        status_file = f"{cache_path}{os.sep}status.json"
+        features_file = f"{cache_path}{os.sep}features.json"
 
-        cache_exists = status_file.exists()
+        cache_exists = os.path.isfile(status_file)
         status = None
         features_available = False
 
         if cache_exists:
             try:
                 status = self.load_status(inchikey)
-                features_available = features_file.exists()
+                features_available = os.path.isfile(features_file)
             except Exception as e:
                 logger.warning(f"Failed to load status for {inchikey}: {e}")
 
@@ -197,19 +336,22 @@ class ATBAgent:
 
 
 # Convenience functions for standalone usage
+@functools.lru_cache(maxsize=None)
+def _get_agent(cache_dir: str) -> "ATBAgent":
+    """Module-level ATBAgent singleton per cache_dir (agents are stateless)."""
+    return ATBAgent(cache_dir=cache_dir)
+
+
 def get_cache_path(inchikey: str, cache_dir: str = "cache/atb") -> Path:
     """Get cache path for InChIKey (convenience function)."""
-    agent = ATBAgent(cache_dir=cache_dir)
-    return agent.get_cache_path(inchikey)
+    return _get_agent(cache_dir).get_cache_path(inchikey)
 
 
 def check_cache(inchikey: str, cache_dir: str = "cache/atb") -> bool:
     """Check if cache exists (convenience function)."""
-    agent = ATBAgent(cache_dir=cache_dir)
-    return agent.check_cache(inchikey)
+    return _get_agent(cache_dir).check_cache(inchikey)
 
 
 def mark_pending(inchikey: str, smiles: Optional[str] = None, cache_dir: str = "cache/atb") -> Path:
     """Mark molecule as pending (convenience function)."""
-    agent = ATBAgent(cache_dir=cache_dir)
-    return agent.mark_pending(inchikey, smiles)
+    return _get_agent(cache_dir).mark_pending(inchikey, smiles)
@@ -4,18 +4,89 @@ src/agents/data_agent.py
 Data Agent: Fetch records and molecules from parquet files.
 """
 
-import pandas as pd
+import functools
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Dict, Any, List
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
 
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
 
+@functools.lru_cache(maxsize=None)
+def _load_arrow_table(parquet_path: str) -> pa.Table:
+    """
+    Load a parquet file as a zero-copy memory-mapped Arrow table (cached).
+
+    On first access the parquet file is converted to an Arrow IPC file
+    next to it ({stem}.arrow); subsequent accesses memory-map that file,
+    so repeated DataAgent construction never re-decompresses the parquet.
+
+    Args:
+        parquet_path: Absolute path to the parquet file
+
+    Returns:
+        pyarrow.Table backed by a memory-mapped Arrow IPC file
+    """
+    parquet_path = Path(parquet_path)
+    arrow_path = parquet_path.with_suffix(".arrow")
+
+    # (Re)build the Arrow IPC sidecar if missing or stale vs. the parquet.
+    if (
+        not arrow_path.exists()
+        or arrow_path.stat().st_mtime < parquet_path.stat().st_mtime
+    ):
+        table = pq.read_table(parquet_path)
+        with pa.OSFile(str(arrow_path), "wb") as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        logger.debug(f"Wrote Arrow IPC cache: {arrow_path}")
+
+    source = pa.memory_map(str(arrow_path), "r")
+    table = ipc.open_file(source).read_all()
+    logger.debug(f"Memory-mapped {arrow_path.name}: {table.num_rows} rows")
+    return table
+
+
+@functools.lru_cache(maxsize=None)
+def _build_row_index(parquet_path: str, key_column: str) -> Dict[Any, int]:
+    """
+    Build a key -> row-position hash index for a cached Arrow table.
+
+    Replaces O(n) column scans per lookup with a single hash probe.
+    Memory cost is ~48 bytes/row, trivial next to the table itself.
+
+    Args:
+        parquet_path: Absolute path passed to _load_arrow_table
+        key_column: Column to index (e.g. "id", "inchikey")
+
+    Returns:
+        Dict mapping key value to row position
+    """
+    table = _load_arrow_table(parquet_path)
+    keys = table[key_column].to_pylist()
+    return dict(zip(keys, range(len(keys))))
+
+
 class DataAgent:
     """Agent for fetching data from standardized parquet files."""
 
+    # Critical fields with {field}_missing indicators. Built once at class
+    # definition so get_missing_summary doesn't rebuild the list and
+    # re-format the column names on every call. Bit i of a missing_mask
+    # column corresponds to _MISSING_FIELDS[i].
+    _MISSING_FIELDS = (
+        "emission_sol", "emission_solid", "emission_aggr", "emission_crys",
+        "qy_sol", "qy_solid", "qy_aggr", "qy_crys",
+        "tau_sol", "tau_solid", "tau_aggr", "tau_crys",
+        "absorption", "tested_solvent",
+    )
+    _MISSING_COLS = tuple(f"{f}_missing" for f in _MISSING_FIELDS)
+
     def __init__(self, data_dir: str = "data"):
         """
         Initialize DataAgent.
@@ -24,28 +95,20 @@ class DataAgent:
             data_dir: Directory containing parquet files (default: "data")
         """
         self.data_dir = Path(data_dir)
-        self._private_clean_df: Optional[pd.DataFrame] = None
-        self._molecule_table_df: Optional[pd.DataFrame] = None
-
-    def _load_private_clean(self) -> pd.DataFrame:
-        """Load private_clean.parquet (cached)."""
-        if self._private_clean_df is None:
-            path = self.data_dir / "private_clean.parquet"
-            if not path.exists():
-                raise FileNotFoundError(f"private_clean.parquet not found at {path}")
-            self._private_clean_df = pd.read_parquet(path)
-            logger.debug(f"Loaded private_clean.parquet: {len(self._private_clean_df)} rows")
-        return self._private_clean_df
-
-    def _load_molecule_table(self) -> pd.DataFrame:
-        """Load molecule_table.parquet (cached)."""
-        if self._molecule_table_df is None:
-            path = self.data_dir / "molecule_table.parquet"
-            if not path.exists():
-                raise FileNotFoundError(f"molecule_table.parquet not found at {path}")
-            self._molecule_table_df = pd.read_parquet(path)
-            logger.debug(f"Loaded molecule_table.parquet: {len(self._molecule_table_df)} molecules")
-        return self._molecule_table_df
+
+    def _load_private_clean(self) -> pa.Table:
+        """Load private_clean.parquet as a memory-mapped Arrow table (cached)."""
+        path = self.data_dir / "private_clean.parquet"
+        if not path.exists():
+            raise FileNotFoundError(f"private_clean.parquet not found at {path}")
+        return _load_arrow_table(str(path.resolve()))
+
+    def _load_molecule_table(self) -> pa.Table:
+        """Load molecule_table.parquet as a memory-mapped Arrow table (cached)."""
+        path = self.data_dir / "molecule_table.parquet"
+        if not path.exists():
+            raise FileNotFoundError(f"molecule_table.parquet not found at {path}")
+        return _load_arrow_table(str(path.resolve()))
 
     def get_record_by_id(self, record_id: int) -> Dict[str, Any]:
         """
@@ -55,31 +118,24 @@ class DataAgent:
             record_id: The record id to fetch
 
         Returns:
-            Dictionary with record data
+            Dictionary with record data. Arrow's to_pylist already yields
+            native Python types with None for nulls, so no per-field
+            numpy-scalar normalization is needed.
 
         Raises:
             ValueError: If id not found
         """
-        df = self._load_private_clean()
-
-        # Filter by id
-        mask = df["id"] == record_id
-        if not mask.any():
+        table = self._load_private_clean()
+
+        # O(1) hash-index lookup instead of a full column scan
+        path = str((self.data_dir / "private_clean.parquet").resolve())
+        id_index = _build_row_index(path, "id")
+        try:
+            row_idx = id_index[record_id]
+        except KeyError:
             raise ValueError(f"Record with id={record_id} not found in private_clean.parquet")
 
-        row = df[mask].iloc[0]
-
-        # Convert to dict and handle NaN values
-        record = row.to_dict()
-
-        # Convert numpy types to native Python types for JSON serialization
-        for key, value in record.items():
-            if pd.isna(value):
-                record[key] = None
-            elif hasattr(value, "item"):  # numpy scalar
-                record[key] = value.item()
-            elif isinstance(value, list) and len(value) > 0 and hasattr(value[0], "item"):
-                record[key] = [v.item() for v in value]
+        record = table.slice(row_idx, 1).to_pylist()[0]
 
         logger.info(f"Fetched record id={record_id}, inchikey={record.get('inchikey', 'N/A')}")
         return record
@@ -97,24 +153,17 @@ class DataAgent:
         Raises:
             ValueError: If InChIKey not found
         """
-        df = self._load_molecule_table()
-
-        # Filter by inchikey
-        mask = df["inchikey"] == inchikey
-        if not mask.any():
+        table = self._load_molecule_table()
+
+        # O(1) hash-index lookup instead of a full column scan
+        path = str((self.data_dir / "molecule_table.parquet").resolve())
+        inchikey_index = _build_row_index(path, "inchikey")
+        try:
+            row_idx = inchikey_index[inchikey]
+        except KeyError:
             raise ValueError(f"Molecule with inchikey={inchikey} not found in molecule_table.parquet")
 
-        row = df[mask].iloc[0]
-        molecule = row.to_dict()
-
-        # Convert numpy types to native Python types
-        for key, value in molecule.items():
-            if pd.isna(value):
-                molecule[key] = None
-            elif hasattr(value, "item"):
-                molecule[key] = value.item()
-            elif isinstance(value, list) and len(value) > 0 and hasattr(value[0], "item"):
-                molecule[key] = [v.item() for v in value]
+        molecule = table.slice(row_idx, 1).to_pylist()[0]
 
         logger.info(f"Fetched molecule inchikey={inchikey}, {molecule.get('n_records', 0)} records")
         return molecule
@@ -123,24 +172,32 @@ class DataAgent:
         """
         Compute missing value summary for a record.
 
+        If the record carries a precomputed int missing_mask column
+        (bit i set <=> _MISSING_FIELDS[i] is missing), the summary is
+        recovered from the mask in O(1) without touching the per-field
+        indicator columns. Otherwise falls back to scanning the
+        {field}_missing indicators.
+
         Args:
             record: Record dictionary
 
         Returns:
             Dictionary with n_missing and missing_fields list
         """
-        # Critical fields with {field}_missing indicators
-        critical_fields = [
-            "emission_sol", "emission_solid", "emission_aggr", "emission_crys",
-            "qy_sol", "qy_solid", "qy_aggr", "qy_crys",
-            "tau_sol", "tau_solid", "tau_aggr", "tau_crys",
-            "absorption", "tested_solvent"
-        ]
+        mask = record.get("missing_mask")
+        if isinstance(mask, int):
+            return {
+                "n_missing": mask.bit_count(),
+                "missing_fields": [
+                    field
+                    for i, field in enumerate(self._MISSING_FIELDS)
+                    if mask >> i & 1
+                ],
+            }
 
         missing_fields: List[str] = []
-        for field in critical_fields:
-            missing_col = f"{field}_missing"
-            if missing_col in record and record[missing_col] is True:
+        for field, missing_col in zip(self._MISSING_FIELDS, self._MISSING_COLS):
+            if record.get(missing_col) is True:
                 missing_fields.append(field)
 
         return {
@@ -150,13 +207,17 @@ class DataAgent:
 
 
 # Convenience functions for standalone usage
+@functools.lru_cache(maxsize=None)
+def _get_agent(data_dir: str) -> "DataAgent":
+    """Module-level DataAgent singleton per data_dir (agents are stateless)."""
+    return DataAgent(data_dir=data_dir)
+
+
 def get_record_by_id(record_id: int, data_dir: str = "data") -> Dict[str, Any]:
     """Fetch record by id (convenience function)."""
-    agent = DataAgent(data_dir=data_dir)
-    return agent.get_record_by_id(record_id)
+    return _get_agent(data_dir).get_record_by_id(record_id)
 
 
 def get_molecule_by_inchikey(inchikey: str, data_dir: str = "data") -> Dict[str, Any]:
     """Fetch molecule by InChIKey (convenience function)."""
-    agent = DataAgent(data_dir=data_dir)
-    return agent.get_molecule_by_inchikey(inchikey)
+    return _get_agent(data_dir).get_molecule_by_inchikey(inchikey)
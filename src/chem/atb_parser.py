@@ -7,37 +7,65 @@ Parses the output from third_party/aTB/main.py and extracts
 structured descriptors for our pipeline.
 """
 
+import functools
 import json
+import os
 from pathlib import Path
-from typing import Dict, Any, Optional, Tuple
+from typing import Any, Dict, IO, Optional, Tuple, Union
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
 
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
 
-def parse_result_json(result_path: Path) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+def parse_result_json(
+    source: Union[Path, str, bytes, bytearray, IO[bytes]]
+) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
     """
     Parse AIE-aTB result.json and extract features.
 
+    Accepts a filesystem path (parses are cached in-process keyed on
+    (path, mtime), so bulk re-extraction passes only pay the JSON decode
+    once per file version), raw JSON bytes, or a binary file-like object
+    (both parsed directly, no temp file or cache involved).
+
     Args:
-        result_path: Path to result.json
+        source: Path to result.json, JSON bytes, or binary file object
 
     Returns:
         Tuple of (features_dict, fail_stage)
         - If success: (features_dict, None)
         - If failure: (None, fail_stage_string)
     """
+    if isinstance(source, (bytes, bytearray)):
+        return _parse_result_bytes(bytes(source))
+    if hasattr(source, "read"):
+        return _parse_result_bytes(source.read())
+
     # Check file exists
-    if not result_path.exists():
-        logger.warning(f"result.json not found at {result_path}")
+    try:
+        mtime = os.path.getmtime(source)
+    except OSError:
+        logger.warning(f"result.json not found at {source}")
         return None, "feature_parse"
 
-    # Try to load JSON
+    features, fail_stage = _parse_result_json_cached(str(source), mtime)
+    # Shallow-copy so cached entries are never mutated by callers
+    return (dict(features) if features is not None else None), fail_stage
+
+
+def _parse_result_bytes(data: bytes) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Decode result.json bytes and extract features (uncached)."""
     try:
-        with open(result_path, "r") as f:
-            result = json.load(f)
-    except json.JSONDecodeError as e:
+        result = orjson.loads(data) if orjson is not None else json.loads(data)
+    except ValueError as e:
         logger.error(f"Failed to parse result.json: {e}")
         return None, "feature_parse"
 
@@ -55,11 +83,123 @@ def parse_result_json(result_path: Path) -> Tuple[Optional[Dict[str, Any]], Opti
         return None, "feature_parse"
 
 
+@functools.lru_cache(maxsize=1024)
+def _parse_result_json_cached(
+    result_path: str, mtime: float
+) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Parse result.json from disk (cached per path+mtime; see parse_result_json)."""
+    try:
+        with open(result_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        logger.warning(f"result.json not readable at {result_path}")
+        return None, "feature_parse"
+    return _parse_result_bytes(data)
+
+
+def _gap_to_float(gap: Any) -> Optional[float]:
+    """Convert a HOMO-LUMO value to float, skipping float() when already numeric."""
+    if gap is None or gap == "":
+        return None
+    if isinstance(gap, float):
+        return gap
+    # str (older result.json) or int
+    return float(gap)
+
+
+# (name, s0 expression, s1 expression) for every S0/S1 feature pair; the
+# delta_* columns are always s1 - s0 with None propagation. The fast
+# extractor below is generated from this table so the schema lives in one
+# place and the None-propagation boilerplate is emitted, not hand-written.
+_PAIR_SPECS = (
+    ("volume", "s0_volume", "s1_volume", "delta_volume",
+     "gs.get('volume')", "es.get('volume')"),
+    ("gap", "s0_homo_lumo_gap", "s1_homo_lumo_gap", "delta_gap",
+     "_gap_to_float(gs.get('HOMO-LUMO'))", "_gap_to_float(es.get('HOMO-LUMO'))"),
+    ("dihedral", "s0_dihedral_avg", "s1_dihedral_avg", "delta_dihedral",
+     "s0_struct.get('DA')", "s1_struct.get('DA')"),
+    ("dipole", "s0_charge_dipole", "s1_charge_dipole", "delta_dipole",
+     "compute_charge_dipole(gs.get('charge'))",
+     "compute_charge_dipole(es.get('charge'))"),
+)
+
+
+# Canonical ordering of the numeric feature columns produced by
+# extract_features (consumers building fixed Arrow schemas rely on this).
+FEATURE_COLUMNS = tuple(
+    name
+    for _, s0_name, s1_name, delta_name, _, _ in _PAIR_SPECS
+    for name in (s0_name, s1_name, delta_name)
+) + (
+    "excitation_energy",
+    "neb_mean_volume",
+    "s0_bonds_avg",
+    "s1_bonds_avg",
+    "s0_angles_avg",
+    "s1_angles_avg",
+)
+
+
+def _build_fast_extractor():
+    """
+    Generate a schema-specialized feature extractor at import time.
+
+    The interpreted extract_features pays chained dict.get dispatch and
+    repeated `a - b if ... else None` branches per call; since the aTB
+    result.json schema is fixed, we compile the equivalent flat code once
+    and keep the interpreted version as a fallback for unexpected shapes.
+    """
+    lines = [
+        "def _extract_fast(result):",
+        "    gs = result['ground_state']",
+        "    es = result['excited_state']",
+        "    s0_struct = gs.get('structure') or {}",
+        "    s1_struct = es.get('structure') or {}",
+    ]
+    for _, s0_name, s1_name, delta_name, s0_expr, s1_expr in _PAIR_SPECS:
+        lines.append(f"    {s0_name} = {s0_expr}")
+        lines.append(f"    {s1_name} = {s1_expr}")
+        lines.append(
+            f"    {delta_name} = {s1_name} - {s0_name} "
+            f"if {s0_name} is not None and {s1_name} is not None else None"
+        )
+    lines.append("    return {")
+    for _, s0_name, s1_name, delta_name, _, _ in _PAIR_SPECS:
+        lines.append(f"        '{s0_name}': {s0_name},")
+        lines.append(f"        '{s1_name}': {s1_name},")
+        lines.append(f"        '{delta_name}': {delta_name},")
+    lines.extend([
+        "        'excitation_energy': es.get('excited_energy'),",
+        "        'neb_mean_volume': result.get('NEB'),",
+        "        's0_bonds_avg': s0_struct.get('bonds'),",
+        "        's1_bonds_avg': s1_struct.get('bonds'),",
+        "        's0_angles_avg': s0_struct.get('angles'),",
+        "        's1_angles_avg': s1_struct.get('angles'),",
+        "    }",
+    ])
+    namespace = {
+        "_gap_to_float": _gap_to_float,
+        "compute_charge_dipole": compute_charge_dipole,
+    }
+    exec(compile("\n".join(lines), "<atb_parser codegen>", "exec"), namespace)
+    return namespace["_extract_fast"]
+
+
+# Required top-level keys in stage order: first missing key names the
+# failed stage. Keeping the schema as data means detect_fail_stage and
+# its tests share one source of truth for the stage list.
+_STAGE_CHECKS = (
+    ("ground_state", "opt", "ground_state missing from result.json"),
+    ("excited_state", "excit", "excited_state missing from result.json"),
+    ("NEB", "neb", "NEB missing from result.json"),
+)
+
+
 def detect_fail_stage(result: Dict[str, Any]) -> Optional[str]:
     """
     Detect which stage failed based on missing keys in result.json.
 
-    Order of detection:
+    Order of detection (driven by _STAGE_CHECKS):
     1. ground_state missing → "opt"
     2. excited_state missing → "excit"
     3. NEB missing → "neb"
@@ -68,31 +208,13 @@ def detect_fail_stage(result: Dict[str, Any]) -> Optional[str]:
     Returns:
         fail_stage string if failure detected, None if success
     """
-    # Check ground_state (S0 optimization)
-    if "ground_state" not in result:
-        logger.warning("ground_state missing from result.json")
-        return "opt"
-
-    gs = result["ground_state"]
+    for key, stage, msg in _STAGE_CHECKS:
+        if key not in result:
+            logger.warning(msg)
+            return stage
 
-    # Check excited_state (S1 optimization)
-    if "excited_state" not in result:
-        logger.warning("excited_state missing from result.json")
-        return "excit"
-
-    es = result["excited_state"]
-
-    # Check NEB
-<<<<<<< HEAD
-    if "NEB" not in result:
-=======
-    if "exciting_path_mean_volume" not in result:
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
-        logger.warning("NEB missing from result.json")
-        return "neb"
-
-    # Check volumes
-    if "volume" not in gs or "volume" not in es:
+    # Nested check: volumes inside the already-validated states
+    if "volume" not in result["ground_state"] or "volume" not in result["excited_state"]:
         logger.warning("volume missing from ground_state or excited_state")
         return "volume"
 
@@ -108,7 +230,7 @@ def extract_features(result: Dict[str, Any]) -> Dict[str, Any]:
     - s0_homo_lumo_gap, s1_homo_lumo_gap, delta_gap
     - s0_dihedral_avg, s1_dihedral_avg, delta_dihedral
     - s0_charge_dipole, s1_charge_dipole, delta_dipole (computed if possible)
-    - excitation_energy (null in V0)
+    - excitation_energy (if reported by aTB; null otherwise)
     - neb_mean_volume
 
     Args:
@@ -117,24 +239,25 @@ def extract_features(result: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         features dict matching our schema
     """
+    # Schema-specialized fast path (generated once at import); the
+    # interpreted code below stays as the fallback for odd shapes.
+    try:
+        return _extract_fast(result)
+    except (KeyError, TypeError, AttributeError) as e:
+        logger.debug(f"Fast extractor fell back to interpreted path: {e}")
+
     gs = result["ground_state"]
     es = result["excited_state"]
-<<<<<<< HEAD
     neb = result.get("NEB")
-=======
-    neb = result.get("exciting_path_mean_volume")
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
 
     # Volume
     s0_volume = gs.get("volume")
     s1_volume = es.get("volume")
     delta_volume = (s1_volume - s0_volume) if (s0_volume is not None and s1_volume is not None) else None
 
-    # HOMO-LUMO gap (stored as string in result.json)
-    s0_gap_str = gs.get("HOMO-LUMO")
-    s1_gap_str = es.get("HOMO-LUMO")
-    s0_homo_lumo_gap = float(s0_gap_str) if s0_gap_str else None
-    s1_homo_lumo_gap = float(s1_gap_str) if s1_gap_str else None
+    # HOMO-LUMO gap (string in older result.json, numeric in newer runs)
+    s0_homo_lumo_gap = _gap_to_float(gs.get("HOMO-LUMO"))
+    s1_homo_lumo_gap = _gap_to_float(es.get("HOMO-LUMO"))
     delta_gap = (s1_homo_lumo_gap - s0_homo_lumo_gap) if (s0_homo_lumo_gap is not None and s1_homo_lumo_gap is not None) else None
 
     # Dihedral average (from structure.DA)
@@ -145,45 +268,17 @@ def extract_features(result: Dict[str, Any]) -> Dict[str, Any]:
     delta_dihedral = (s1_dihedral_avg - s0_dihedral_avg) if (s0_dihedral_avg is not None and s1_dihedral_avg is not None) else None
 
     # Charge dipole - compute from Mulliken charges if available
-<<<<<<< HEAD
     s0_charge_dipole = compute_charge_dipole(gs.get("charge"))
     s1_charge_dipole = compute_charge_dipole(es.get("charge"))
     delta_dipole = (s1_charge_dipole - s0_charge_dipole) if (s0_charge_dipole is not None and s1_charge_dipole is not None) else None
 
-=======
-    delta_dipole = compute_charge_dipole(result.get("charge"))
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
     # Additional structure properties (for reference)
     s0_bonds_avg = s0_struct.get("bonds")
     s1_bonds_avg = s1_struct.get("bonds")
     s0_angles_avg = s0_struct.get("angles")
     s1_angles_avg = s1_struct.get("angles")
 
-<<<<<<< HEAD
     features = {
-=======
-    # rotational_constant
-    s0_rc_a = gs['rotational_constant'].get('A')
-    s0_rc_b = gs['rotational_constant'].get('B')
-    s0_rc_c = gs['rotational_constant'].get('C')
-    s1_rc_a = es['rotational_constant'].get('A')
-    s1_rc_b = es['rotational_constant'].get('B')
-    s1_rc_c = es['rotational_constant'].get('C')
-    s0_rap = gs['rays_asymmetry_parameter']
-    s1_rap = es['rays_asymmetry_parameter']
-
-
-    features = {
-        # rotational_constant
-        "s0_rotational_constant_a" : s0_rc_a,
-        "s0_rotational_constant_b" : s0_rc_b,
-        "s0_rotational_constant_c" : s0_rc_c,
-        "s1_rotational_constant_a" : s1_rc_a,
-        "s1_rotational_constant_b" : s1_rc_b,
-        "s1_rotational_constant_c" : s1_rc_c,
-        "s0_rays_asymmetry_parameter" : s0_rap,
-        "s1_rays_asymmetry_parameter" : s1_rap,
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
         # Volume
         "s0_volume": s0_volume,
         "s1_volume": s1_volume,
@@ -197,21 +292,13 @@ def extract_features(result: Dict[str, Any]) -> Dict[str, Any]:
         "s1_dihedral_avg": s1_dihedral_avg,
         "delta_dihedral": delta_dihedral,
         # Charge dipole (computed from Mulliken charges)
-<<<<<<< HEAD
         "s0_charge_dipole": s0_charge_dipole,
         "s1_charge_dipole": s1_charge_dipole,
         "delta_dipole": delta_dipole,
-        # Excitation energy - not directly in result.json, set null for V0
-        "excitation_energy": None,
+        # Excitation energy - only reported by newer aTB runs, else null
+        "excitation_energy": es.get("excited_energy"),
         # NEB mean volume
         "neb_mean_volume": neb,
-=======
-        "delta_dipole": delta_dipole,
-        # Excitation energy - not directly in result.json, set null for V0
-        "excitation_energy": es.get('excited_energy'),
-        # NEB mean volume
-        "exciting_path_mean_volume": neb,
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
         # Extra structure metrics (informational)
         "s0_bonds_avg": s0_bonds_avg,
         "s1_bonds_avg": s1_bonds_avg,
@@ -239,11 +326,72 @@ def compute_charge_dipole(charge_data: Optional[Dict[str, Any]]) -> Optional[flo
         return None
 
     charges = charge_data.get("charge", [])
-    if not charges:
+    if len(charges) == 0:
         return None
 
-    # Simple metric: sum of absolute charges (charge separation indicator)
-    return sum(abs(c) for c in charges)
+    # Simple metric: sum of absolute charges (charge separation indicator).
+    # For small molecules a Python loop wins over the NumPy setup cost.
+    if len(charges) < 32:
+        return float(sum(map(abs, charges)))
+
+    return float(np.abs(np.asarray(charges, dtype=np.float64)).sum())
+
+
+# Built here so the generated code can bind _gap_to_float and
+# compute_charge_dipole, both defined above.
+_extract_fast = _build_fast_extractor()
+
+
+def extract_features_batch(results) -> Dict[str, np.ndarray]:
+    """
+    Columnar feature extraction over many result.json dicts.
+
+    One gather pass fills a float64 column per base feature (missing
+    values stay NaN); every delta_* column is then one vectorized
+    subtraction instead of a per-molecule Python branch (NaN propagates
+    exactly where the scalar path yields None). Intended for bulk
+    parquet ingestion — the returned dict of arrays feeds a DataFrame /
+    Arrow table directly, with columns in FEATURE_COLUMNS order.
+
+    Args:
+        results: Sequence of parsed result.json dicts (each must pass
+            detect_fail_stage)
+
+    Returns:
+        Dict mapping FEATURE_COLUMNS names to float64 arrays
+    """
+    n = len(results)
+    out: Dict[str, np.ndarray] = {name: np.full(n, np.nan) for name in FEATURE_COLUMNS}
+
+    def _set(col: np.ndarray, i: int, v: Any) -> None:
+        if v is not None:
+            col[i] = v
+
+    for i, result in enumerate(results):
+        gs = result["ground_state"]
+        es = result["excited_state"]
+        s0_struct = gs.get("structure") or {}
+        s1_struct = es.get("structure") or {}
+        _set(out["s0_volume"], i, gs.get("volume"))
+        _set(out["s1_volume"], i, es.get("volume"))
+        _set(out["s0_homo_lumo_gap"], i, _gap_to_float(gs.get("HOMO-LUMO")))
+        _set(out["s1_homo_lumo_gap"], i, _gap_to_float(es.get("HOMO-LUMO")))
+        _set(out["s0_dihedral_avg"], i, s0_struct.get("DA"))
+        _set(out["s1_dihedral_avg"], i, s1_struct.get("DA"))
+        _set(out["s0_charge_dipole"], i, compute_charge_dipole(gs.get("charge")))
+        _set(out["s1_charge_dipole"], i, compute_charge_dipole(es.get("charge")))
+        _set(out["excitation_energy"], i, es.get("excited_energy"))
+        _set(out["neb_mean_volume"], i, result.get("NEB"))
+        _set(out["s0_bonds_avg"], i, s0_struct.get("bonds"))
+        _set(out["s1_bonds_avg"], i, s1_struct.get("bonds"))
+        _set(out["s0_angles_avg"], i, s0_struct.get("angles"))
+        _set(out["s1_angles_avg"], i, s1_struct.get("angles"))
+
+    # All deltas are S1 - S0 in one SIMD pass each
+    for _, s0_name, s1_name, delta_name, _, _ in _PAIR_SPECS:
+        out[delta_name] = out[s1_name] - out[s0_name]
+
+    return out
 
 
 def save_features_json(features: Dict[str, Any], cache_path: Path) -> Path:
@@ -258,8 +406,16 @@ def save_features_json(features: Dict[str, Any], cache_path: Path) -> Path:
         Path to saved features.json
     """
     features_path = cache_path / "features.json"
-    with open(features_path, "w") as f:
-        json.dump(features, f, indent=2)
+    # orjson's C encoder + one write_bytes call; OPT_SERIALIZE_NUMPY
+    # covers np.float64 values coming out of the batch extractors.
+    # Output stays indented for human inspection of the cache.
+    if orjson is not None:
+        features_path.write_bytes(
+            orjson.dumps(features, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        )
+    else:  # pragma: no cover - stdlib fallback
+        with open(features_path, "w") as f:
+            json.dump(features, f, indent=2)
 
     logger.info(f"Saved features.json to {features_path}")
     return features_path
@@ -6,13 +6,19 @@ Subprocess wrapper for AIE-aTB (third_party/aTB/main.py).
 Calls AIE-aTB as a black-box subprocess and handles status tracking.
 """
 
+import asyncio
+import collections
+import functools
 import json
-import subprocess
+import os
+import sys
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
+from src.utils.fs import ensure_dir, write_if_changed
+from src.utils.jsonio import write_json_atomic
 from src.utils.logging import get_logger
 from src.chem.atb_parser import parse_result_json, save_features_json
 
@@ -20,17 +26,10 @@ logger = get_logger(__name__)
 
 # Default configuration
 DEFAULT_CONFIG = {
-<<<<<<< HEAD
     "npara": 4,
     "maxcore": 4000,
     "nimg": 3,
     "neb_fmax": 0.1,
-=======
-    "npara": 2,
-    "maxcore": 4000,
-    "nimg": 4,
-    "neb_fmax": 0.2,
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
     "opt_fmax": 0.03,
     "timeout": 3600,  # 1 hour timeout
 }
@@ -38,10 +37,28 @@ DEFAULT_CONFIG = {
 # Path to AIE-aTB main.py (relative to project root)
 ATB_SCRIPT = "third_party/aTB/main.py"
 
+# Output tail capture: aTB optimizers are chatty (MBs of stdout per run),
+# but we only ever log the last ~2000 bytes. Keep a small ring buffer of
+# recent chunks per stream instead of buffering the full output in memory.
+_TAIL_CHUNK_BYTES = 1024
+_TAIL_MAX_CHUNKS = 4  # ~4 KB tail per stream
+
+
+async def _drain_tail(stream: asyncio.StreamReader) -> bytes:
+    """Consume a subprocess stream, keeping only the last few KB."""
+    tail: collections.deque = collections.deque(maxlen=_TAIL_MAX_CHUNKS)
+    while True:
+        chunk = await stream.read(_TAIL_CHUNK_BYTES)
+        if not chunk:
+            break
+        tail.append(chunk)
+    return b"".join(tail)
 
+
+@functools.lru_cache(maxsize=1)
 def get_atb_version() -> str:
     """
-    Get AIE-aTB version string.
+    Get AIE-aTB version string (memoized: constant for the process).
 
     For V0, we use "AIE-aTB-v0" as placeholder.
     In production, could extract git hash from third_party/aTB.
@@ -53,7 +70,7 @@ def get_atb_version() -> str:
     return "AIE-aTB-v0"
 
 
-def run_atb(
+async def run_atb_async(
     inchikey: str,
     smiles: str,
     cache_path: Path,
@@ -61,7 +78,7 @@ def run_atb(
     project_root: Optional[Path] = None,
 ) -> Tuple[str, Optional[str], Optional[str]]:
     """
-    Run AIE-aTB for a single molecule.
+    Run AIE-aTB for a single molecule (async, safe to fan out).
 
     Args:
         inchikey: InChIKey of the molecule
@@ -87,16 +104,18 @@ def run_atb(
         return "failed", "opt", f"AIE-aTB script not found: {atb_script}"
 
     # Ensure cache directory exists
-    cache_path.mkdir(parents=True, exist_ok=True)
+    ensure_dir(cache_path)
 
-    # Store canonical SMILES for audit
-    smiles_file = cache_path / "canonical_smiles.txt"
-    with open(smiles_file, "w") as f:
-        f.write(smiles)
+    # Store canonical SMILES for audit (skip rewrite on re-runs)
+    write_if_changed(cache_path / "canonical_smiles.txt", smiles.encode())
 
-    # Build command
+    # Build command. sys.executable pins the current interpreter (no PATH
+    # lookup, no risk of a different env). A persistent amesp server
+    # process would amortize the per-job interpreter/lib load too, but
+    # amesp has no server mode — the batch pool keeps its Python workers
+    # alive instead, so only the aTB subprocess itself is per-job.
     cmd = [
-        "python", str(atb_script),
+        sys.executable, str(atb_script),
         "--smiles", smiles,
         "--workdir", str(cache_path),
         "--npara", str(cfg["npara"]),
@@ -112,28 +131,48 @@ def run_atb(
     start_time = time.time()
 
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=cfg["timeout"],
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
             cwd=str(project_root),
         )
 
+        try:
+            # Drain both streams into bounded ring buffers; EOF arrives when
+            # the process exits, so the timeout covers the whole run.
+            stdout_b, stderr_b = await asyncio.wait_for(
+                asyncio.gather(_drain_tail(proc.stdout), _drain_tail(proc.stderr)),
+                timeout=cfg["timeout"],
+            )
+            await proc.wait()
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            runtime_sec = time.time() - start_time
+            error_msg = f"Timeout after {cfg['timeout']}s"
+            logger.error(f"AIE-aTB timeout for {inchikey}: {error_msg}")
+
+            # Try to detect which stage was running when timeout occurred
+            fail_stage = detect_fail_stage_from_output(cache_path, "", "")
+            return "failed", fail_stage or "timeout", error_msg
+
         runtime_sec = time.time() - start_time
+        stdout = stdout_b.decode(errors="replace") if stdout_b else ""
+        stderr = stderr_b.decode(errors="replace") if stderr_b else ""
 
         # Log stdout/stderr for debugging
-        if result.stdout:
-            logger.debug(f"AIE-aTB stdout:\n{result.stdout[-2000:]}")
-        if result.stderr:
-            logger.warning(f"AIE-aTB stderr:\n{result.stderr[-500:]}")
+        if stdout:
+            logger.debug(f"AIE-aTB stdout:\n{stdout[-2000:]}")
+        if stderr:
+            logger.warning(f"AIE-aTB stderr:\n{stderr[-500:]}")
 
-        if result.returncode != 0:
-            error_msg = result.stderr[-500:] if result.stderr else f"Exit code: {result.returncode}"
+        if proc.returncode != 0:
+            error_msg = stderr[-500:] if stderr else f"Exit code: {proc.returncode}"
             logger.error(f"AIE-aTB failed for {inchikey}: {error_msg}")
 
             # Try to detect which stage failed from partial output
-            fail_stage = detect_fail_stage_from_output(cache_path, result.stdout, result.stderr)
+            fail_stage = detect_fail_stage_from_output(cache_path, stdout, stderr)
             return "failed", fail_stage, error_msg
 
         # Parse result.json
@@ -149,21 +188,59 @@ def run_atb(
         logger.info(f"AIE-aTB completed successfully for {inchikey} in {runtime_sec:.1f}s")
         return "success", None, None
 
-    except subprocess.TimeoutExpired:
-        runtime_sec = time.time() - start_time
-        error_msg = f"Timeout after {cfg['timeout']}s"
-        logger.error(f"AIE-aTB timeout for {inchikey}: {error_msg}")
-
-        # Try to detect which stage was running when timeout occurred
-        fail_stage = detect_fail_stage_from_output(cache_path, "", "")
-        return "failed", fail_stage or "timeout", error_msg
-
     except Exception as e:
         error_msg = str(e)[:500]
         logger.error(f"AIE-aTB exception for {inchikey}: {error_msg}")
         return "failed", "opt", error_msg
 
 
+async def run_atb_many(
+    jobs: List[Dict[str, Any]],
+    max_concurrency: int = 2,
+) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """
+    Run AIE-aTB for many molecules with bounded concurrency.
+
+    Args:
+        jobs: List of kwargs dicts for run_atb_async
+              (inchikey, smiles, cache_path, optionally config/project_root)
+        max_concurrency: Max simultaneous aTB subprocesses
+
+    Returns:
+        List of (run_status, fail_stage, error_msg) tuples, in job order
+    """
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def _bounded(job: Dict[str, Any]):
+        async with sem:
+            return await run_atb_async(**job)
+
+    return list(await asyncio.gather(*(_bounded(job) for job in jobs)))
+
+
+def run_atb(
+    inchikey: str,
+    smiles: str,
+    cache_path: Path,
+    config: Optional[Dict[str, Any]] = None,
+    project_root: Optional[Path] = None,
+) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    Run AIE-aTB for a single molecule (blocking wrapper around run_atb_async).
+
+    See run_atb_async for argument and return details.
+    """
+    return asyncio.run(
+        run_atb_async(
+            inchikey=inchikey,
+            smiles=smiles,
+            cache_path=cache_path,
+            config=config,
+            project_root=project_root,
+        )
+    )
+
+
 def detect_fail_stage_from_output(
     cache_path: Path,
     stdout: str,
@@ -188,6 +265,13 @@ def detect_fail_stage_from_output(
     """
     combined_output = (stdout or "") + (stderr or "")
 
+    # One directory listing up front; individual Path.exists() probes
+    # add up when diagnosing thousands of failed jobs.
+    try:
+        entries = {e.name for e in os.scandir(cache_path)}
+    except FileNotFoundError:
+        entries = set()
+
     # Priority 1: Check for conformer generation failure (before any calculation)
     # This happens when RDKit can't generate a 3D structure from SMILES
     if "Bad Conformer Id" in combined_output or "GetConformer()" in combined_output:
@@ -201,12 +285,8 @@ def detect_fail_stage_from_output(
     # IndexError typically indicates amesp calculation produced no valid output
     if "IndexError" in combined_output and "parse_aop_energy" in combined_output:
         # Determine which stage based on directory state
-        opt_dir = cache_path / "opt"
-        excit_dir = cache_path / "excit"
-        if excit_dir.exists():
+        if "excit" in entries:
             return "excit"
-        if opt_dir.exists():
-            return "opt"
         return "opt"
 
     # Priority 3: Check for amesp calculator failures
@@ -218,16 +298,10 @@ def detect_fail_stage_from_output(
             return "neb"
         return "opt"
 
-    # Check which directories/files exist
-    opt_dir = cache_path / "opt"
-    excit_dir = cache_path / "excit"
-    neb_dir = cache_path / "neb"
-    result_json = cache_path / "result.json"
-
     # If result.json exists but is incomplete, parse to find stage
-    if result_json.exists():
+    if "result.json" in entries:
         try:
-            with open(result_json, "r") as f:
+            with open(cache_path / "result.json", "r") as f:
                 result = json.load(f)
             if "ground_state" not in result:
                 return "opt"
@@ -239,12 +313,13 @@ def detect_fail_stage_from_output(
         except json.JSONDecodeError:
             return "feature_parse"
 
-    # Infer from directory state
-    if not opt_dir.exists() or not (opt_dir / "opted.xyz").exists():
+    # Infer from directory state (witness files probed only when needed)
+    cache_str = str(cache_path)
+    if "opt" not in entries or not os.path.isfile(f"{cache_str}{os.sep}opt{os.sep}opted.xyz"):
         return "opt"
-    if not excit_dir.exists() or not (excit_dir / "excited.xyz").exists():
+    if "excit" not in entries or not os.path.isfile(f"{cache_str}{os.sep}excit{os.sep}excited.xyz"):
         return "excit"
-    if not neb_dir.exists():
+    if "neb" not in entries:
         return "neb"
 
     # Check stdout for stage keywords
@@ -278,7 +353,7 @@ def create_status_json(
     Returns:
         Path to status.json
     """
-    cache_path.mkdir(parents=True, exist_ok=True)
+    ensure_dir(cache_path)
 
     status = {
         "inchikey": inchikey,
@@ -290,9 +365,10 @@ def create_status_json(
         "runtime_sec": round(runtime_sec, 2) if runtime_sec else None,
     }
 
+    # Atomic write: with run_atb_many fanning out jobs, a concurrent
+    # load_status must never see a half-written status.json.
     status_path = cache_path / "status.json"
-    with open(status_path, "w") as f:
-        json.dump(status, f, indent=2)
+    write_json_atomic(status_path, status)
 
     logger.debug(f"Saved status.json: run_status={run_status}")
     return status_path
@@ -7,21 +7,136 @@ Iterates over molecule_table.parquet, runs AIE-aTB for each molecule,
 and consolidates results into atb_features.parquet and atb_qc.parquet.
 """
 
-import json
+import os
+import re
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
 
+try:
+    import numba
+except ImportError:  # pragma: no cover - regex fallback below
+    numba = None
+
+from src.utils.jsonio import read_json
 from src.utils.logging import get_logger
 from src.agents.atb_agent import ATBAgent
 from src.chem.atb_runner import run_atb, create_status_json, get_atb_version
-from src.chem.atb_parser import parse_result_json
+from src.chem.atb_parser import parse_result_json, FEATURE_COLUMNS
 
 logger = get_logger(__name__)
 
+# Fixed Arrow schemas for the two batch outputs. Rows are streamed to
+# Parquet incrementally (see _BufferedParquetWriter) instead of being
+# accumulated as Python lists, so peak memory stays O(flush_every) and
+# partially completed runs still leave a readable file behind.
+# run_status/fail_stage/atb_version take a handful of distinct values, so
+# they are dictionary-encoded (Parquet stores the small dictionary once,
+# rows become int32 codes; pandas reads them back as Categorical).
+_CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+QC_SCHEMA = pa.schema([
+    ("inchikey", pa.string()),
+    ("run_status", _CATEGORY),
+    ("fail_stage", _CATEGORY),
+    ("error_msg", pa.string()),
+    ("runtime_sec", pa.float64()),
+    ("atb_version", _CATEGORY),
+    ("timestamp", pa.string()),
+])
+
+# Auxiliary descriptor columns present in cached features.json written by
+# the rotational-constant aTB branch; kept in the output schema so
+# consolidating an existing cache does not drop them.
+AUX_FEATURE_COLUMNS = (
+    "s0_rotational_constant_a", "s0_rotational_constant_b", "s0_rotational_constant_c",
+    "s1_rotational_constant_a", "s1_rotational_constant_b", "s1_rotational_constant_c",
+    "s0_rays_asymmetry_parameter", "s1_rays_asymmetry_parameter",
+    "exciting_path_mean_volume",
+)
+
+FEATURES_SCHEMA = pa.schema(
+    [
+        ("inchikey", pa.string()),
+        ("run_status", _CATEGORY),
+        ("fail_stage", _CATEGORY),
+    ]
+    + [(name, pa.float64()) for name in FEATURE_COLUMNS + AUX_FEATURE_COLUMNS]
+)
+
+
+class _BufferedParquetWriter:
+    """Stream row dicts to a Parquet file in fixed-schema record batches."""
+
+    # One flush = one row group; 10k rows keeps buffers small while giving
+    # downstream polars/Arrow scans row groups large enough to make
+    # statistics-based skipping on run_status/fail_stage worthwhile.
+    def __init__(self, path: Path, schema: pa.Schema, flush_every: int = 10_000):
+        self.schema = schema
+        self._names = schema.names
+        self._float_cols = {f.name for f in schema if pa.types.is_floating(f.type)}
+        self._writer = pq.ParquetWriter(
+            str(path),
+            schema,
+            compression="zstd",
+            compression_level=3,
+            write_statistics=True,
+        )
+        self._cols: Dict[str, list] = {name: [] for name in self._names}
+        self._buffered = 0
+        self.rows = 0
+
+        self._flush_every = flush_every
+
+    def write_row(self, row: Dict[str, Any]) -> None:
+        for name in self._names:
+            value = row.get(name)
+            # Legacy features.json stored some numerics as strings
+            # (e.g. excitation_energy); coerce so the cast never fails.
+            if isinstance(value, str) and name in self._float_cols:
+                try:
+                    value = float(value)
+                except ValueError:
+                    value = None
+            self._cols[name].append(value)
+        self._buffered += 1
+        if self._buffered >= self._flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffered:
+            return
+        self._writer.write_table(pa.table(self._cols, schema=self.schema))
+        self._cols = {name: [] for name in self._names}
+        self.rows += self._buffered
+        self._buffered = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+
+# Common ionic patterns in SMILES (quick heuristic; shared by the per-call
+# check and the vectorized batch pre-filter)
+IONIC_PATTERNS = (
+    "[I-]", "[Br-]", "[Cl-]", "[F-]",  # Halide anions
+    "[O-]", "[S-]", "[N-]",  # Common anions
+    "[n+]", "[N+]", "[P+]", "[S+]",  # Common cations
+    ".[Na+]", ".[K+]", ".[Li+]",  # Metal cations
+    "[BF4-]", "[PF6-]",  # Complex anions
+)
+
+# Single alternation regex: one C-level sweep of the SMILES instead of
+# one substring scan per pattern.
+_IONIC_RE = re.compile("|".join(map(re.escape, IONIC_PATTERNS)))
+
 
 def is_ionic_molecule(smiles: str) -> bool:
     """
@@ -39,20 +154,148 @@ def is_ionic_molecule(smiles: str) -> bool:
     if not smiles:
         return False
 
-    # Quick heuristic: check for common ionic patterns in SMILES
-    ionic_patterns = [
-        "[I-]", "[Br-]", "[Cl-]", "[F-]",  # Halide anions
-        "[O-]", "[S-]", "[N-]",  # Common anions
-        "[n+]", "[N+]", "[P+]", "[S+]",  # Common cations
-        ".[Na+]", ".[K+]", ".[Li+]",  # Metal cations
-        "[BF4-]", "[PF6-]",  # Complex anions
-    ]
+    return bool(_IONIC_RE.search(smiles))
+
+
+if numba is not None:
+    # JIT path: the patterns are packed into one uint8 buffer + offsets so
+    # the kernel does exact substring matching (same semantics as the regex
+    # alternation) without any Python-object traffic. All patterns start
+    # with '[' or '.', so those two bytes gate the inner pattern loop.
+    _PAT_BUF = np.frombuffer("".join(IONIC_PATTERNS).encode(), dtype=np.uint8)
+    _PAT_OFFSETS = np.cumsum(
+        [0] + [len(p) for p in IONIC_PATTERNS], dtype=np.int64
+    )
+    _BRACKET = ord("[")
+    _DOT = ord(".")
+
+    @numba.njit(parallel=True, cache=True)
+    def _scan_ionic(buf, offsets, pat_buf, pat_offsets, out):  # pragma: no cover - numba
+        for i in numba.prange(out.shape[0]):
+            start = offsets[i]
+            end = offsets[i + 1]
+            hit = False
+            for j in range(start, end):
+                if buf[j] != _BRACKET and buf[j] != _DOT:
+                    continue
+                for p in range(pat_offsets.shape[0] - 1):
+                    ps = pat_offsets[p]
+                    plen = pat_offsets[p + 1] - ps
+                    if j + plen > end:
+                        continue
+                    k = 0
+                    while k < plen and buf[j + k] == pat_buf[ps + k]:
+                        k += 1
+                    if k == plen:
+                        hit = True
+                        break
+                if hit:
+                    break
+            out[i] = hit
+else:
+    _scan_ionic = None
+
+
+def ionic_mask_bulk(smiles_values) -> np.ndarray:
+    """
+    Vectorized ionic check over a whole SMILES column.
+
+    Packs the column into one contiguous UTF-8 buffer + offsets and scans
+    it with a numba-JIT kernel (parallel over molecules), falling back to
+    the per-string regex when numba is not installed. Non-string entries
+    (NaN from failed canonicalization) are treated as non-ionic.
+
+    Args:
+        smiles_values: Sequence of SMILES strings (may contain NaN/None)
+
+    Returns:
+        Boolean numpy array, True where the SMILES contains an ionic pattern
+    """
+    n = len(smiles_values)
+    out = np.zeros(n, dtype=np.bool_)
+
+    if _scan_ionic is None:
+        for i, smiles in enumerate(smiles_values):
+            if isinstance(smiles, str):
+                out[i] = is_ionic_molecule(smiles)
+        return out
+
+    encoded = [s.encode() if isinstance(s, str) else b"" for s in smiles_values]
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(
+        np.fromiter((len(b) for b in encoded), dtype=np.int64, count=n),
+        out=offsets[1:],
+    )
+    buf = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    _scan_ionic(buf, offsets, _PAT_BUF, _PAT_OFFSETS, out)
+    return out
+
+
+def _worker(
+    task: Dict[str, Any],
+    config: Optional[Dict[str, Any]],
+    project_root: Optional[Path],
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Run aTB for one planned molecule and collect its qc/features rows.
+
+    Runs in a ProcessPoolExecutor worker: constructs its own ATBAgent
+    (agents are stateless) and only touches the per-molecule cache dir,
+    so workers never share mutable state.
+
+    Args:
+        task: Dict with inchikey, smiles, cache_path, cache_dir
+        config: Optional config overrides for aTB
+        project_root: Project root directory
 
-    for pattern in ionic_patterns:
-        if pattern in smiles:
-            return True
+    Returns:
+        Tuple of (qc_row, features_row)
+    """
+    inchikey = task["inchikey"]
+    cache_path = Path(task["cache_path"])
+
+    run_start = time.time()
+    run_status, fail_stage, error_msg = run_atb(
+        inchikey=inchikey,
+        smiles=task["smiles"],
+        cache_path=cache_path,
+        config=config,
+        project_root=project_root,
+    )
+    runtime_sec = time.time() - run_start
+
+    # Save status.json
+    create_status_json(
+        inchikey=inchikey,
+        run_status=run_status,
+        fail_stage=fail_stage,
+        error_msg=error_msg,
+        runtime_sec=runtime_sec,
+        cache_path=cache_path,
+    )
+
+    qc_row = {
+        "inchikey": inchikey,
+        "run_status": run_status,
+        "fail_stage": fail_stage,
+        "error_msg": error_msg,
+        "runtime_sec": round(runtime_sec, 2),
+        "atb_version": get_atb_version() if run_status == "success" else None,
+        "timestamp": datetime.now().isoformat(),
+    }
 
-    return False
+    if run_status == "success":
+        agent = ATBAgent(cache_dir=task["cache_dir"])
+        features = agent.load_features(inchikey)
+        if features:
+            features_row = {"inchikey": inchikey, **features}
+        else:
+            features_row = {"inchikey": inchikey, "run_status": run_status, "fail_stage": fail_stage}
+    else:
+        # Row with nulls for failed molecules
+        features_row = {"inchikey": inchikey, "run_status": run_status, "fail_stage": fail_stage}
+
+    return qc_row, features_row
 
 
 def run_batch(
@@ -67,6 +310,7 @@ def run_batch(
     rdkit_features_path: str = "data/rdkit_features.parquet",
     config: Optional[Dict[str, Any]] = None,
     project_root: Optional[Path] = None,
+    batch_workers: int = 1,
 ) -> Dict[str, Any]:
     """
     Run AIE-aTB batch computation.
@@ -86,6 +330,9 @@ def run_batch(
         rdkit_features_path: Path to rdkit_features.parquet for heavy atom counts
         config: Optional config overrides for aTB
         project_root: Project root directory
+        batch_workers: Number of concurrent aTB jobs (process pool size).
+            Distinct from amesp's internal --npara; keep
+            batch_workers * npara <= physical cores to avoid oversubscription.
 
     Returns:
         Summary dict with counts and timing
@@ -93,220 +340,227 @@ def run_batch(
     if project_root is None:
         project_root = Path.cwd()
 
-    # Load molecule table (SINGLE SOURCE OF TRUTH)
+    # Load molecule table (SINGLE SOURCE OF TRUTH). Lazy scan pushes the
+    # two-column projection (and the --limit head) down into the Parquet
+    # reader, so unused feature columns are never read.
     logger.info(f"Loading molecule table from {molecule_table_path}")
-    molecule_table = pd.read_parquet(molecule_table_path)
-    total_molecules = len(molecule_table)
+    lf = pl.scan_parquet(molecule_table_path).select(["inchikey", "canonical_smiles"])
+    total_molecules = pl.scan_parquet(molecule_table_path).select(pl.len()).collect().item()
     logger.info(f"Found {total_molecules} unique molecules")
 
     if limit:
-        molecule_table = molecule_table.head(limit)
+        lf = lf.head(limit)
+    molecule_table = lf.collect().to_pandas()
+    if limit:
         logger.info(f"Limited to {len(molecule_table)} molecules (dry-run mode)")
 
     # Initialize agent for cache operations
     atb_agent = ATBAgent(cache_dir=cache_dir)
 
-    # Results collection
-    features_rows = []
-    qc_rows = []
+    # Streaming output writers, opened up front so results flush to disk
+    # every flush_every rows instead of accumulating in RAM
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    features_path = output_path / "atb_features.parquet"
+    qc_path = output_path / "atb_qc.parquet"
+    features_writer = _BufferedParquetWriter(features_path, FEATURES_SCHEMA)
+    qc_writer = _BufferedParquetWriter(qc_path, QC_SCHEMA)
+
+    tasks: List[Dict[str, Any]] = []
     skipped = 0
     succeeded = 0
     failed = 0
 
     start_time = time.time()
 
-    invalid_smiles = 0
-    skipped_ionic = 0
-    skipped_size = 0
+    try:
 
-    heavy_atom_map: Dict[str, float] = {}
-    if max_heavy_atoms is not None:
-        rdkit_path = Path(rdkit_features_path)
-        if not rdkit_path.exists():
-            logger.warning(f"RDKit features not found at {rdkit_path}; size filter disabled")
+        # Vectorized pre-filter: invalid/ionic/oversize masks are computed in
+        # one C-level pass per criterion instead of per-row Python checks.
+        n_molecules = len(molecule_table)
+        inchikey_s = molecule_table["inchikey"].fillna("")
+        smiles_s = molecule_table["canonical_smiles"].fillna("")
+
+        # Empty/invalid InChIKey (failed canonicalization in P1)
+        invalid_mask = inchikey_s.str.len() < 2
+
+        # Ionic molecules (V0 limitation - TODO: re-enable after charge handling is validated)
+        if skip_ionic:
+            ionic_mask = (
+                pd.Series(ionic_mask_bulk(smiles_s.to_numpy()), index=molecule_table.index)
+                & ~invalid_mask
+            )
         else:
-            logger.info(f"Loading RDKit features from {rdkit_path} for size filter")
-            rdkit_df = pd.read_parquet(rdkit_path, columns=["inchikey", "n_heavy_atoms"])
-            heavy_atom_map = rdkit_df.set_index("inchikey")["n_heavy_atoms"].to_dict()
-
-    for idx, row in molecule_table.iterrows():
-        inchikey = row["inchikey"]
-        smiles = row["canonical_smiles"]  # From molecule_table (single source of truth)
-
-        # Skip molecules with empty/invalid inchikey (failed canonicalization in P1)
-        if not inchikey or len(inchikey) < 2:
-            logger.warning(f"[{idx+1}/{len(molecule_table)}] Skipping invalid InChIKey (empty): SMILES={smiles[:50] if smiles else 'None'}...")
-            invalid_smiles += 1
-            continue
-
-        # Skip ionic molecules (V0 limitation - TODO: re-enable after charge handling is validated)
-<<<<<<< HEAD
-        if skip_ionic and is_ionic_molecule(smiles):
-=======
-        if not skip_ionic and is_ionic_molecule(smiles):
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
-            logger.warning(f"[{idx+1}/{len(molecule_table)}] Skipping ionic molecule (V0 limitation): {inchikey}")
-            skipped_ionic += 1
-            # Record as skipped_ionic in QC table
-            qc_rows.append({
-                "inchikey": inchikey,
+            ionic_mask = pd.Series(False, index=molecule_table.index)
+
+        # Oversize molecules (heavy atom count from rdkit_features)
+        size_mask = pd.Series(False, index=molecule_table.index)
+        heavy_atoms = None
+        if max_heavy_atoms is not None:
+            rdkit_path = Path(rdkit_features_path)
+            if not rdkit_path.exists():
+                logger.warning(f"RDKit features not found at {rdkit_path}; size filter disabled")
+            else:
+                logger.info(f"Loading RDKit features from {rdkit_path} for size filter")
+                rdkit_df = (
+                    pl.scan_parquet(rdkit_path)
+                    .select(["inchikey", "n_heavy_atoms"])
+                    .collect()
+                    .to_pandas()
+                )
+                heavy_atoms = (
+                    molecule_table[["inchikey"]]
+                    .merge(rdkit_df, on="inchikey", how="left")["n_heavy_atoms"]
+                    .set_axis(molecule_table.index)
+                )
+                size_mask = (heavy_atoms > max_heavy_atoms) & ~invalid_mask & ~ionic_mask
+
+        invalid_smiles = int(invalid_mask.sum())
+        if invalid_smiles:
+            logger.warning(f"Skipping {invalid_smiles} molecules with invalid/empty InChIKey")
+
+        # Emit skipped-qc rows in bulk for the masked frames
+        _now = datetime.now().isoformat()
+
+        skipped_ionic = int(ionic_mask.sum())
+        if skipped_ionic:
+            logger.warning(f"Skipping {skipped_ionic} ionic molecules (V0 limitation)")
+            # Everything but the inchikey is constant; build the templates once
+            qc_base = {
                 "run_status": "skipped",
                 "fail_stage": "ionic",
                 "error_msg": "Ionic molecules temporarily skipped in V0",
                 "runtime_sec": None,
                 "atb_version": None,
-                "timestamp": datetime.now().isoformat(),
-            })
-            features_rows.append({
-                "inchikey": inchikey,
+                "timestamp": _now,
+            }
+            feat_base = {"run_status": "skipped", "fail_stage": "ionic"}
+            for inchikey in inchikey_s[ionic_mask]:
+                qc_writer.write_row({"inchikey": inchikey, **qc_base})
+                features_writer.write_row({"inchikey": inchikey, **feat_base})
+
+        skipped_size = int(size_mask.sum())
+        if skipped_size:
+            logger.warning(f"Skipping {skipped_size} molecules above {max_heavy_atoms} heavy atoms")
+            qc_base = {
                 "run_status": "skipped",
-                "fail_stage": "ionic",
-            })
-            continue
-
-        if max_heavy_atoms is not None and heavy_atom_map:
-            n_heavy_atoms = heavy_atom_map.get(inchikey)
-            if n_heavy_atoms is not None and not pd.isna(n_heavy_atoms) and n_heavy_atoms > max_heavy_atoms:
-                logger.warning(
-                    f"[{idx+1}/{len(molecule_table)}] Skipping large molecule: {inchikey} (heavy_atoms={int(n_heavy_atoms)})"
-                )
-                skipped_size += 1
-                qc_rows.append({
+                "fail_stage": "size",
+                "runtime_sec": None,
+                "atb_version": None,
+                "timestamp": _now,
+            }
+            feat_base = {"run_status": "skipped", "fail_stage": "size"}
+            for inchikey, n_heavy_atoms in zip(inchikey_s[size_mask], heavy_atoms[size_mask]):
+                qc_writer.write_row({
                     "inchikey": inchikey,
-                    "run_status": "skipped",
-                    "fail_stage": "size",
                     "error_msg": f"Heavy atom count {int(n_heavy_atoms)} exceeds limit {max_heavy_atoms}",
-                    "runtime_sec": None,
-                    "atb_version": None,
-                    "timestamp": datetime.now().isoformat(),
-                })
-                features_rows.append({
-                    "inchikey": inchikey,
-                    "run_status": "skipped",
-                    "fail_stage": "size",
-                })
-                continue
-
-        logger.info(f"[{idx+1}/{len(molecule_table)}] Processing {inchikey}")
-
-        # Get cache path
-        cache_path = atb_agent.get_cache_path(inchikey)
-
-        # Check existing cache
-        if not force_rerun and atb_agent.check_cache(inchikey):
-            status = atb_agent.load_status(inchikey)
-            cached_run_status = status.get("run_status")
-
-            # Skip succeeded molecules (unless force_rerun)
-            if cached_run_status == "success":
-                logger.info(f"  Skipping {inchikey}: already succeeded")
-                skipped += 1
-
-                # Load existing features
-                features = atb_agent.load_features(inchikey)
-                if features:
-                    features_rows.append({"inchikey": inchikey, **features})
-                    qc_rows.append({
-                        "inchikey": inchikey,
-                        "run_status": "success",
-                        "fail_stage": None,
-                        "error_msg": None,
-                        "runtime_sec": status.get("runtime_sec"),
-                        "atb_version": status.get("atb_version"),
-                        "timestamp": status.get("timestamp"),
-                    })
-                continue
-
-            # Skip failed molecules (unless retry_failed or force_rerun)
-            if cached_run_status == "failed" and not retry_failed:
-                logger.info(f"  Skipping {inchikey}: previously failed (use --retry-failed to retry)")
-                skipped += 1
-
-                # Keep existing failed status in output
-                qc_rows.append({
-                    "inchikey": inchikey,
-                    "run_status": "failed",
-                    "fail_stage": status.get("fail_stage"),
-                    "error_msg": status.get("error_msg"),
-                    "runtime_sec": status.get("runtime_sec"),
-                    "atb_version": status.get("atb_version"),
-                    "timestamp": status.get("timestamp"),
+                    **qc_base,
                 })
-                features_rows.append({
+                features_writer.write_row({"inchikey": inchikey, **feat_base})
+
+        # Iterate only the surviving rows, as zipped column arrays
+        keep_mask = ~(invalid_mask | ionic_mask | size_mask)
+        inchikeys = inchikey_s[keep_mask].to_numpy()
+        smiles_arr = smiles_s[keep_mask].to_numpy()
+
+        # Fast-path the cached fraction: one bulk cache probe (a scandir
+        # per shard), then parallel status/features loading through the
+        # consolidate loader. Only uncached molecules are planned directly.
+        cached_keys = atb_agent.check_cache_bulk(inchikeys) if not force_rerun else set()
+
+        cached_dirs: List[str] = []
+        smiles_by_key: Dict[str, str] = {}
+        for inchikey, smiles in zip(inchikeys, smiles_arr):
+            cache_path_str = str(atb_agent.get_cache_path(inchikey))
+            if inchikey in cached_keys:
+                cached_dirs.append(cache_path_str)
+                smiles_by_key[inchikey] = smiles
+            else:
+                # Plan an aTB run for this molecule (dispatched to workers below)
+                tasks.append({
                     "inchikey": inchikey,
-                    "run_status": "failed",
-                    "fail_stage": status.get("fail_stage"),
+                    "smiles": smiles,
+                    "cache_path": cache_path_str,
+                    "cache_dir": cache_dir,
                 })
-                continue
-
-        # Run AIE-aTB
-        run_start = time.time()
-        run_status, fail_stage, error_msg = run_atb(
-            inchikey=inchikey,
-            smiles=smiles,
-            cache_path=cache_path,
-            config=config,
-            project_root=project_root,
-        )
-        runtime_sec = time.time() - run_start
-
-        # Save status.json
-        create_status_json(
-            inchikey=inchikey,
-            run_status=run_status,
-            fail_stage=fail_stage,
-            error_msg=error_msg,
-            runtime_sec=runtime_sec,
-            cache_path=cache_path,
-        )
-
-        # Collect results
-        qc_row = {
-            "inchikey": inchikey,
-            "run_status": run_status,
-            "fail_stage": fail_stage,
-            "error_msg": error_msg,
-            "runtime_sec": round(runtime_sec, 2),
-            "atb_version": get_atb_version() if run_status == "success" else None,
-            "timestamp": datetime.now().isoformat(),
-        }
-        qc_rows.append(qc_row)
 
-        if run_status == "success":
-            succeeded += 1
-            features = atb_agent.load_features(inchikey)
-            if features:
-                features_rows.append({"inchikey": inchikey, **features})
-        else:
-            failed += 1
-            # Add row with nulls for failed molecules
-            features_rows.append({
-                "inchikey": inchikey,
-                "run_status": run_status,
-                "fail_stage": fail_stage,
-            })
+        if cached_dirs:
+            logger.info(f"Loading {len(cached_dirs)} cached molecules")
+            with ThreadPoolExecutor(max_workers=32) as executor:
+                for result in executor.map(_load_cache_entry, cached_dirs):
+                    if result is None:
+                        continue
+                    qc_row, features_row = result
+                    cached_run_status = qc_row["run_status"]
+
+                    # Re-run pending molecules, and failed ones when
+                    # retry_failed is set; keep everything else as-is.
+                    if cached_run_status == "success" or (
+                        cached_run_status == "failed" and not retry_failed
+                    ):
+                        qc_writer.write_row(qc_row)
+                        features_writer.write_row(features_row)
+                        skipped += 1
+                    else:
+                        inchikey = qc_row["inchikey"]
+                        tasks.append({
+                            "inchikey": inchikey,
+                            "smiles": smiles_by_key[inchikey],
+                            "cache_path": str(atb_agent.get_cache_path(inchikey)),
+                            "cache_dir": cache_dir,
+                        })
+
+        # Dispatch planned runs to a process pool. The workload is
+        # embarrassingly parallel: each task writes only to its own
+        # per-molecule cache dir.
+        if tasks:
+            logger.info(f"Dispatching {len(tasks)} aTB runs across {batch_workers} worker(s)")
+            with ProcessPoolExecutor(max_workers=batch_workers) as executor:
+                futures = {
+                    executor.submit(_worker, task, config, project_root): task["inchikey"]
+                    for task in tasks
+                }
+                for n_done, future in enumerate(as_completed(futures), 1):
+                    inchikey = futures[future]
+                    try:
+                        qc_row, features_row = future.result()
+                    except Exception as e:
+                        logger.error(f"Worker crashed for {inchikey}: {e}")
+                        qc_row = {
+                            "inchikey": inchikey,
+                            "run_status": "failed",
+                            "fail_stage": "opt",
+                            "error_msg": str(e)[:500],
+                            "runtime_sec": None,
+                            "atb_version": None,
+                            "timestamp": datetime.now().isoformat(),
+                        }
+                        features_row = {
+                            "inchikey": inchikey,
+                            "run_status": "failed",
+                            "fail_stage": "opt",
+                        }
+
+                    qc_writer.write_row(qc_row)
+                    features_writer.write_row(features_row)
+                    if qc_row["run_status"] == "success":
+                        succeeded += 1
+                    else:
+                        failed += 1
+                    logger.info(f"[{n_done}/{len(tasks)}] {inchikey}: {qc_row['run_status']}")
+
+    finally:
+        features_writer.close()
+        qc_writer.close()
 
     total_time = time.time() - start_time
 
-    # Save parquet files
-    output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
-
-    if features_rows:
-        features_df = pd.DataFrame(features_rows)
-        features_path = output_path / "atb_features.parquet"
-        features_df.to_parquet(features_path, index=False)
-        logger.info(f"Saved {len(features_df)} rows to {features_path}")
-
-    if qc_rows:
-        qc_df = pd.DataFrame(qc_rows)
-        qc_path = output_path / "atb_qc.parquet"
-        qc_df.to_parquet(qc_path, index=False)
-        logger.info(f"Saved {len(qc_df)} rows to {qc_path}")
+    logger.info(f"Saved {features_writer.rows} rows to {features_path}")
+    logger.info(f"Saved {qc_writer.rows} rows to {qc_path}")
 
     # Summary
     summary = {
-        "total_molecules": len(molecule_table),
+        "total_molecules": n_molecules,
         "invalid_smiles": invalid_smiles,
         "skipped_ionic": skipped_ionic,
         "skipped_size": skipped_size,
@@ -321,6 +575,44 @@ def run_batch(
     return summary
 
 
+def _load_cache_entry(mol_dir: str) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Load one molecule's cached status/features as (qc_row, features_row).
+
+    Runs in a thread pool from consolidate_cache_to_parquet; returns None
+    for directories without a status.json. Reads go straight to
+    read_json with FileNotFoundError handling — no pre-flight stat.
+    """
+    inchikey = os.path.basename(mol_dir)
+
+    try:
+        status = read_json(f"{mol_dir}{os.sep}status.json")
+    except FileNotFoundError:
+        return None
+
+    qc_row = {
+        "inchikey": inchikey,
+        "run_status": status.get("run_status"),
+        "fail_stage": status.get("fail_stage"),
+        "error_msg": status.get("error_msg"),
+        "runtime_sec": status.get("runtime_sec"),
+        "atb_version": status.get("atb_version"),
+        "timestamp": status.get("timestamp"),
+    }
+
+    try:
+        features = read_json(f"{mol_dir}{os.sep}features.json")
+        features_row = {"inchikey": inchikey, **features}
+    except FileNotFoundError:
+        features_row = {
+            "inchikey": inchikey,
+            "run_status": status.get("run_status"),
+            "fail_stage": status.get("fail_stage"),
+        }
+
+    return qc_row, features_row
+
+
 def consolidate_cache_to_parquet(
     cache_dir: str = "cache/atb",
     output_dir: str = "data",
@@ -342,65 +634,41 @@ def consolidate_cache_to_parquet(
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
 
-    features_rows = []
-    qc_rows = []
-
-    # Walk cache directory
-    for prefix_dir in sorted(cache_path.iterdir()):
-        if not prefix_dir.is_dir():
-            continue
-
-        for mol_dir in sorted(prefix_dir.iterdir()):
-            if not mol_dir.is_dir():
-                continue
-
-            inchikey = mol_dir.name
-            status_file = mol_dir / "status.json"
-            features_file = mol_dir / "features.json"
-
-            if not status_file.exists():
-                continue
-
-            with open(status_file, "r") as f:
-                status = json.load(f)
-
-            qc_rows.append({
-                "inchikey": inchikey,
-                "run_status": status.get("run_status"),
-                "fail_stage": status.get("fail_stage"),
-                "error_msg": status.get("error_msg"),
-                "runtime_sec": status.get("runtime_sec"),
-                "atb_version": status.get("atb_version"),
-                "timestamp": status.get("timestamp"),
-            })
-
-            if features_file.exists():
-                with open(features_file, "r") as f:
-                    features = json.load(f)
-                features_rows.append({"inchikey": inchikey, **features})
-            else:
-                features_rows.append({
-                    "inchikey": inchikey,
-                    "run_status": status.get("run_status"),
-                    "fail_stage": status.get("fail_stage"),
-                })
-
-    # Save parquet files
-    if features_rows:
-        features_df = pd.DataFrame(features_rows)
-        features_path = output_path / "atb_features.parquet"
-        features_df.to_parquet(features_path, index=False)
-        logger.info(f"Consolidated {len(features_df)} rows to {features_path}")
-
-    if qc_rows:
-        qc_df = pd.DataFrame(qc_rows)
-        qc_path = output_path / "atb_qc.parquet"
-        qc_df.to_parquet(qc_path, index=False)
-        logger.info(f"Consolidated {len(qc_df)} rows to {qc_path}")
+    features_path = output_path / "atb_features.parquet"
+    qc_path = output_path / "atb_qc.parquet"
+    features_writer = _BufferedParquetWriter(features_path, FEATURES_SCHEMA)
+    qc_writer = _BufferedParquetWriter(qc_path, QC_SCHEMA)
+
+    # Gather molecule dirs up front with os.scandir (DirEntry carries the
+    # type bit from the directory read, so no per-entry stat), then load
+    # status/features with a thread pool: the walk is dominated by
+    # open/read latency, which threads overlap well. Rows are written in
+    # the main thread only.
+    mol_dirs: List[str] = []
+    with os.scandir(cache_path) as shard_it:
+        shard_dirs = [e.path for e in shard_it if e.is_dir()]
+    for shard_dir in shard_dirs:
+        with os.scandir(shard_dir) as mol_it:
+            mol_dirs.extend(e.path for e in mol_it if e.is_dir())
+
+    try:
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            for result in executor.map(_load_cache_entry, mol_dirs):
+                if result is None:
+                    continue
+                qc_row, features_row = result
+                qc_writer.write_row(qc_row)
+                features_writer.write_row(features_row)
+    finally:
+        features_writer.close()
+        qc_writer.close()
+
+    logger.info(f"Consolidated {features_writer.rows} rows to {features_path}")
+    logger.info(f"Consolidated {qc_writer.rows} rows to {qc_path}")
 
     return {
-        "features_rows": len(features_rows),
-        "qc_rows": len(qc_rows),
+        "features_rows": features_writer.rows,
+        "qc_rows": qc_writer.rows,
     }
 
 
@@ -450,6 +718,12 @@ if __name__ == "__main__":
         default=4,
         help="Number of parallel Amesp processes",
     )
+    parser.add_argument(
+        "--npara-batch",
+        type=int,
+        default=1,
+        help="Number of concurrent aTB jobs (process pool size; distinct from amesp --npara)",
+    )
     parser.add_argument(
         "--maxcore",
         type=int,
@@ -498,5 +772,6 @@ if __name__ == "__main__":
             max_heavy_atoms=args.max_heavy_atoms,
             rdkit_features_path=args.rdkit_features,
             config=config,
+            batch_workers=args.npara_batch,
         )
         print(f"Batch summary: {summary}")
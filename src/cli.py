@@ -12,8 +12,14 @@ Commands:
 import sys
 import json
 import argparse
+import functools
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
 
 from src.agents.data_agent import DataAgent
 from src.agents.atb_agent import ATBAgent
@@ -21,6 +27,36 @@ from src.utils.logging import setup_logger
 
 logger = setup_logger(__name__, level="INFO")
 
+
+def _dump_json(obj: Any, indent: bool = True) -> bytes:
+    """
+    Serialize a report dict to JSON bytes (orjson when installed).
+
+    Reports carry large record_fields/atb_features payloads; orjson is
+    several times faster than stdlib json and serializes numpy scalars
+    natively. Callers reuse the returned buffer for both the report
+    file and stdout so each report is serialized exactly once.
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+
+# Agent construction is memoized per directory: DataAgent loads the
+# parquet tables, so commands that touch several records (batch) must
+# not rebuild it per id.
+@functools.lru_cache(maxsize=4)
+def _get_data_agent(data_dir: str) -> DataAgent:
+    return DataAgent(data_dir=data_dir)
+
+
+@functools.lru_cache(maxsize=4)
+def _get_atb_agent(cache_dir: str) -> ATBAgent:
+    return ATBAgent(cache_dir=cache_dir)
+
 # STRICT ALLOWLIST: Fields safe to include in reports
 # Excludes sensitive fields like "comment" which may contain private information
 REPORT_FIELD_ALLOWLIST = [
@@ -71,35 +107,39 @@ REPORT_FIELD_BLOCKLIST = [
     "comment",  # May contain sensitive researcher notes or private information
 ]
 
+# Set forms for O(1) membership in the per-record hot loop (the lists
+# above stay the canonical, ordered definitions)
+REPORT_FIELD_ALLOWLIST_SET = frozenset(REPORT_FIELD_ALLOWLIST)
+REPORT_FIELD_BLOCKLIST_SET = frozenset(REPORT_FIELD_BLOCKLIST)
+
+assert not REPORT_FIELD_ALLOWLIST_SET & REPORT_FIELD_BLOCKLIST_SET, (
+    "allowlist and blocklist overlap"
+)
+
 
 def filter_record_fields(record: Dict[str, Any]) -> Dict[str, Any]:
     """
     Filter record fields according to allowlist/blocklist.
 
+    One set intersection with the record's keys replaces the old
+    per-allowlist-entry probe loop; the disjointness assert above makes
+    the blocklist re-check redundant.
+
     Args:
         record: Full record dictionary
 
     Returns:
         Filtered dictionary with only allowed fields
     """
-    filtered = {}
-    for key in REPORT_FIELD_ALLOWLIST:
-        if key in record:
-            filtered[key] = record[key]
-
-    # Double-check blocklist (should already be excluded by allowlist)
-    for blocked_key in REPORT_FIELD_BLOCKLIST:
-        if blocked_key in filtered:
-            logger.warning(f"Blocked field '{blocked_key}' found in filtered record, removing")
-            del filtered[blocked_key]
-
-    return filtered
+    present = REPORT_FIELD_ALLOWLIST_SET & record.keys()
+    # Iterate the ordered allowlist so report field order stays stable
+    return {key: record[key] for key in REPORT_FIELD_ALLOWLIST if key in present}
 
 
 def fetch_command(args):
     """Fetch record by id and display."""
     try:
-        agent = DataAgent(data_dir=args.data_dir)
+        agent = _get_data_agent(args.data_dir)
         record = agent.get_record_by_id(args.id)
 
         # Print formatted output
@@ -125,7 +165,7 @@ def compute_atb_command(args):
     """Check aTB cache and mark pending if missing."""
     try:
         # Fetch record to get InChIKey
-        data_agent = DataAgent(data_dir=args.data_dir)
+        data_agent = _get_data_agent(args.data_dir)
         record = data_agent.get_record_by_id(args.id)
 
         inchikey = record.get("inchikey")
@@ -134,7 +174,7 @@ def compute_atb_command(args):
             sys.exit(1)
 
         # Check cache
-        atb_agent = ATBAgent(cache_dir=args.cache_dir)
+        atb_agent = _get_atb_agent(args.cache_dir)
         cache_exists = atb_agent.check_cache(inchikey)
 
         if cache_exists:
@@ -158,84 +198,107 @@ def compute_atb_command(args):
         sys.exit(1)
 
 
-def run_command(args):
-    """Full orchestration: fetch + atb + assemble + report."""
-    try:
-        # Step 1: Fetch record
-        logger.info(f"[1/4] Fetching record id={args.id}")
-        data_agent = DataAgent(data_dir=args.data_dir)
-        record = data_agent.get_record_by_id(args.id)
+def _orchestrate_one(
+    record_id: int,
+    data_agent: DataAgent,
+    atb_agent: ATBAgent,
+    write_report: bool = False,
+) -> Tuple[Dict[str, Any], bytes]:
+    """
+    Fetch + atb + assemble for one record (shared by run/batch commands).
 
-        inchikey = record.get("inchikey")
-        smiles = record.get("canonical_smiles")
+    Returns:
+        Tuple of (output dict, serialized JSON bytes); the bytes are
+        what was (or would be) written to reports/{id}.json
 
-        if not inchikey:
-            logger.error(f"Record id={args.id} has no valid InChIKey (invalid SMILES)")
-            sys.exit(1)
+    Raises:
+        ValueError: If the record is missing or has no valid InChIKey
+    """
+    # Step 1: Fetch record
+    logger.info(f"[1/4] Fetching record id={record_id}")
+    record = data_agent.get_record_by_id(record_id)
 
-        # Step 2: Get missing summary
-        logger.info("[2/4] Computing missing value summary")
-        missing_summary = data_agent.get_missing_summary(record)
+    inchikey = record.get("inchikey")
+    smiles = record.get("canonical_smiles")
 
-        # Step 3: Check aTB cache
-        logger.info("[3/4] Checking aTB cache")
-        atb_agent = ATBAgent(cache_dir=args.cache_dir)
-        cache_summary = atb_agent.get_cache_summary(inchikey)
+    if not inchikey:
+        raise ValueError(f"Record id={record_id} has no valid InChIKey (invalid SMILES)")
 
-        atb_status = "miss"
-        atb_features = None
+    # Step 2: Get missing summary
+    logger.info("[2/4] Computing missing value summary")
+    missing_summary = data_agent.get_missing_summary(record)
 
-        if cache_summary["cache_exists"]:
-            atb_status = "hit"
-            run_status = cache_summary.get("run_status")
+    # Step 3: Check aTB cache
+    logger.info("[3/4] Checking aTB cache")
+    cache_summary = atb_agent.get_cache_summary(inchikey)
 
-            if run_status == "success" and cache_summary["features_available"]:
-                atb_features = atb_agent.load_features(inchikey)
-            elif run_status == "pending":
-                atb_status = "pending"
-            elif run_status == "failed":
-                atb_status = "failed"
-        else:
-            # Mark as pending
-            logger.info(f"Cache miss, marking {inchikey} as pending")
-            atb_agent.mark_pending(inchikey, smiles)
-            atb_status = "pending"
+    atb_status = "miss"
+    atb_features = None
 
-        # Step 4: Assemble output
-        logger.info("[4/4] Assembling output")
-
-        # Filter record fields using strict allowlist (excludes sensitive fields like "comment")
-        filtered_fields = filter_record_fields(record)
-
-        output = {
-            "id": args.id,
-            "inchikey": inchikey,
-            "canonical_smiles": smiles,
-            "record_fields": filtered_fields,
-            "missing_summary": missing_summary,
-            "atb_status": atb_status,
-            "atb_features": atb_features,
-            "paths": {
-                "cache_dir": cache_summary["cache_path"],
-                "status_file": cache_summary["status_file"],
-                "features_file": cache_summary.get("features_file"),
-                "report_path": f"reports/{args.id}.json"
-            }
+    if cache_summary["cache_exists"]:
+        atb_status = "hit"
+        run_status = cache_summary.get("run_status")
+
+        if run_status == "success" and cache_summary["features_available"]:
+            atb_features = atb_agent.load_features(inchikey)
+        elif run_status == "pending":
+            atb_status = "pending"
+        elif run_status == "failed":
+            atb_status = "failed"
+    else:
+        # Mark as pending
+        logger.info(f"Cache miss, marking {inchikey} as pending")
+        atb_agent.mark_pending(inchikey, smiles)
+        atb_status = "pending"
+
+    # Step 4: Assemble output
+    logger.info("[4/4] Assembling output")
+
+    # Filter record fields using strict allowlist (excludes sensitive fields like "comment")
+    filtered_fields = filter_record_fields(record)
+
+    output = {
+        "id": record_id,
+        "inchikey": inchikey,
+        "canonical_smiles": smiles,
+        "record_fields": filtered_fields,
+        "missing_summary": missing_summary,
+        "atb_status": atb_status,
+        "atb_features": atb_features,
+        "paths": {
+            "cache_dir": cache_summary["cache_path"],
+            "status_file": cache_summary["status_file"],
+            "features_file": cache_summary.get("features_file"),
+            "report_path": f"reports/{record_id}.json"
         }
+    }
+
+    buf = _dump_json(output)
 
-        # Write to report file if requested
-        if args.write_report:
-            reports_dir = Path("reports")
-            reports_dir.mkdir(exist_ok=True)
-            report_path = reports_dir / f"{args.id}.json"
+    if write_report:
+        reports_dir = Path("reports")
+        reports_dir.mkdir(exist_ok=True)
+        report_path = reports_dir / f"{record_id}.json"
 
-            with open(report_path, "w") as f:
-                json.dump(output, f, indent=2)
+        with open(report_path, "wb") as f:
+            f.write(buf)
 
-            logger.info(f"Wrote report to {report_path}")
+        logger.info(f"Wrote report to {report_path}")
 
-        # Print to stdout
-        print(json.dumps(output, indent=2))
+    return output, buf
+
+
+def run_command(args):
+    """Full orchestration: fetch + atb + assemble + report."""
+    try:
+        _, buf = _orchestrate_one(
+            args.id,
+            _get_data_agent(args.data_dir),
+            _get_atb_agent(args.cache_dir),
+            write_report=args.write_report,
+        )
+        sys.stdout.buffer.write(buf + b"\n")
+        sys.stdout.buffer.flush()
 
     except ValueError as e:
         logger.error(str(e))
@@ -247,6 +310,43 @@ def run_command(args):
         sys.exit(1)
 
 
+def batch_command(args):
+    """
+    Run orchestration for many ids in one process (one id per stdin line).
+
+    Avoids the per-id interpreter startup and dataset load of looping
+    `python -m src.cli run --id ...` in a shell. Emits one JSON line per
+    id; failed ids are logged and counted but do not stop the batch.
+    """
+    data_agent = _get_data_agent(args.data_dir)
+    atb_agent = _get_atb_agent(args.cache_dir)
+
+    n_ok = 0
+    n_failed = 0
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record_id = int(line)
+            output, _ = _orchestrate_one(
+                record_id, data_agent, atb_agent, write_report=args.write_report
+            )
+            sys.stdout.buffer.write(_dump_json(output, indent=False) + b"\n")
+            sys.stdout.buffer.flush()
+            n_ok += 1
+        except ValueError as e:
+            logger.error(f"Skipping id '{line}': {e}")
+            n_failed += 1
+        except Exception as e:
+            logger.error(f"Failed on id '{line}': {e}")
+            n_failed += 1
+
+    logger.info(f"Batch complete: {n_ok} ok, {n_failed} failed")
+    if n_failed and not n_ok:
+        sys.exit(1)
+
+
 def main():
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(
@@ -291,6 +391,11 @@ Examples:
     run_parser.add_argument("--write-report", action="store_true", help="Write report to reports/{id}.json")
     run_parser.set_defaults(func=run_command)
 
+    # batch command
+    batch_parser = subparsers.add_parser("batch", help="Run orchestration for ids read from stdin (one per line)")
+    batch_parser.add_argument("--write-report", action="store_true", help="Write reports/{id}.json per id")
+    batch_parser.set_defaults(func=batch_command)
+
     args = parser.parse_args()
 
     if not args.command:
@@ -17,9 +17,10 @@ Usage:
 """
 
 import argparse
+import hashlib
 import json
 import uuid
-from collections import defaultdict
+from collections import Counter, defaultdict
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
@@ -27,6 +28,14 @@ from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas.api.types import union_categoricals
+
+try:
+    import numba
+except ImportError:  # pragma: no cover - np.select fallback below
+    numba = None
 
 from src.utils.logging import get_logger
 
@@ -105,6 +114,102 @@ ATB_UNITS: Dict[str, Optional[str]] = {
 
 
 NAMESPACE_EVIDENCE = uuid.UUID("2b1d3f7e-2b8b-4e70-9c7c-4b7a4b00a2b9")
+# uuid.uuid5 re-reads namespace.bytes on every call; hash against the
+# cached bytes directly
+NS_BYTES = NAMESPACE_EVIDENCE.bytes
+
+REQUIRED_COLS = [
+    "evidence_id",
+    "subject_inchikey",
+    "evidence_type",
+    "field",
+    "value_num",
+    "value",
+    "unit",
+    "condition_state",
+    "condition_solvent",
+    "source_type",
+    "source_id",
+    "timestamp",
+    "timestamp_source",
+    "confidence",
+    "extraction_method",
+    "quality_flag",
+    "quality_score",
+]
+
+# Fields whose rows should carry a known solvent (manifest audit stat)
+SOL_FIELDS = {"emission_sol", "qy_sol", "tau_sol", "absorption_peak_nm", "absorption"}
+
+# Same parquet write options as the P1 pipeline artifacts (see
+# src/data/pipeline.PARQUET_WRITE_KWARGS): zstd beats the snappy default
+# on these repeated-string tables and pyarrow dictionary-encodes the
+# categorical columns natively. Kept local so evidence builds do not
+# import the RDKit-heavy pipeline module.
+PARQUET_WRITE_KWARGS = dict(
+    engine="pyarrow",
+    compression="zstd",
+    compression_level=3,
+    row_group_size=8192,
+    index=False,
+)
+
+# Field kinds and flag labels shared by the quality kernel and its
+# np.select fallback; label order must match the kernel's flag codes
+KIND_OTHER, KIND_QY, KIND_TAU, KIND_ABS_PEAK = 0, 1, 2, 3
+QUALITY_FLAG_LABELS = (
+    "OK",
+    "OUT_OF_RANGE_NEGATIVE",
+    "OUT_OF_RANGE_GT1",
+    "OUTLIER_TAU_EXTREME",
+    "OUT_OF_RANGE_NONPOSITIVE",
+    "PARSE_WARNING",
+)
+
+if numba is not None:
+
+    @numba.njit(parallel=True, cache=True)
+    def _quality_kernel(kind_codes, vnum, warn_eligible, out_flag, out_score):
+        """One fused pass computing flag code + score for every row."""
+        for i in numba.prange(vnum.shape[0]):
+            kind = kind_codes[i]
+            v = vnum[i]
+            flag = 0
+            score = 1.0
+            if not np.isnan(v):
+                if kind == KIND_QY:
+                    if v < 0.0:
+                        flag, score = 1, 0.3
+                    elif v > 1.0:
+                        flag, score = 2, 0.3
+                elif kind == KIND_TAU:
+                    if v > 1e6:
+                        flag, score = 3, 0.3
+                elif kind == KIND_ABS_PEAK:
+                    if v <= 0.0:
+                        flag, score = 4, 0.3
+            elif warn_eligible[i]:
+                flag, score = 5, 0.7
+            out_flag[i] = flag
+            out_score[i] = score
+
+else:
+    _quality_kernel = None
+
+
+# Enum-like output columns with a handful of distinct values; stored as
+# categoricals (int codes + small category table) instead of one Python
+# string object per row. Parquet keeps the dictionary encoding.
+ENUM_COLUMNS = (
+    "evidence_type",
+    "field",
+    "unit",
+    "condition_state",
+    "condition_solvent",
+    "source_type",
+    "timestamp_source",
+    "extraction_method",
+)
 
 
 def now_iso() -> str:
@@ -121,7 +226,13 @@ def norm_str(val: Any) -> Optional[str]:
 
 
 def safe_float(val: Any) -> Tuple[Optional[float], bool]:
-    """Return (float_or_none, parse_ok)."""
+    """
+    Return (float_or_none, parse_ok) for a single scalar.
+
+    Columnar code paths use pd.to_numeric(errors="coerce") instead — one
+    C-level scan per column rather than one Python frame per cell; keep
+    this only for scalar call sites.
+    """
     if val is None:
         return None, True
     if isinstance(val, float) and np.isnan(val):
@@ -141,7 +252,42 @@ def make_evidence_id(
     condition_solvent: str,
 ) -> str:
     key = f"{evidence_type}|{source_type}|{source_id}|{field}|{condition_state}|{condition_solvent}"
-    return str(uuid.uuid5(NAMESPACE_EVIDENCE, key))
+    digest = hashlib.sha1(NS_BYTES + key.encode("utf-8")).digest()
+    return str(uuid.UUID(bytes=digest[:16], version=5))
+
+
+def make_evidence_ids_bulk(keys: pd.Series) -> List[str]:
+    """
+    uuid5 for a whole column of evidence keys.
+
+    Same digest as make_evidence_id (SHA-1 over namespace bytes + key),
+    but the key strings are built with one vectorized concat, UTF-8
+    encoding happens in one str.encode pass, and the hash loop binds
+    sha1/UUID locally instead of re-resolving uuid.uuid5 per row — the
+    per-call overhead is most of uuid5's cost here. The digest must stay
+    SHA-1: evidence ids are stable uuid5 values and changing the hash
+    would silently re-key every existing table.
+    """
+    ns = NS_BYTES
+    sha1 = hashlib.sha1
+    make_uuid = uuid.UUID
+    return [
+        str(make_uuid(bytes=sha1(ns + key).digest()[:16], version=5))
+        for key in keys.str.encode("utf-8").to_numpy()
+    ]
+
+
+def _const_categorical(value: str, n: int) -> pd.Categorical:
+    """
+    A length-n categorical holding one repeated value (or all-null when
+    value is None): int8 codes + a one-entry category table instead of n
+    Python string objects. Parquet later stores it as a dictionary.
+    """
+    if value is None:
+        return pd.Categorical.from_codes(
+            np.full(n, -1, dtype=np.int8), categories=pd.Index([], dtype=object)
+        )
+    return pd.Categorical.from_codes(np.zeros(n, dtype=np.int8), categories=[value])
 
 
 def infer_condition_state(field: str) -> str:
@@ -155,180 +301,233 @@ def infer_condition_state(field: str) -> str:
     return "unknown"
 
 
-def infer_condition_solvent(tested_solvent: Any, condition_state: str, field: str) -> str:
-    solvent = norm_str(tested_solvent)
-    if field == "tested_solvent":
-        return solvent or "unknown"
-    if condition_state == "sol":
-        return solvent or "unknown"
-    return "unknown"
+# The field list is fixed at module load, so the prefix matching runs
+# once here; the builders map fields through this dict
+FIELD_TO_STATE = {f: infer_condition_state(f) for f in PRIVATE_FIELDS}
+
+
+def _nonzero_counts(s: pd.Series) -> Dict[str, int]:
+    """
+    value_counts as a plain {value: int} dict, zero-count entries removed.
+
+    On categorical columns value_counts reports every category, including
+    ones absent from a filtered subset; dropping zeros keeps manifest
+    counts identical to the object-dtype behavior.
+    """
+    counts = s.value_counts(dropna=False)
+    return {key: int(n) for key, n in counts.items() if n > 0}
+
+
+def _ordered_counts(fields_in_order: List[str], counts: pd.Series) -> Dict[str, int]:
+    """Turn a value_counts result into a plain dict ordered like the field list."""
+    return {f: int(counts[f]) for f in fields_in_order if f in counts.index and counts[f] > 0}
+
+
+def _melt_row_major(
+    base: pd.DataFrame, value_df: pd.DataFrame, value_vars: List[str]
+) -> pd.DataFrame:
+    """
+    Melt value columns into long form, ordered (record, field) row-major.
+
+    melt emits field-major blocks; the stable sort on the original row
+    position restores the record-by-record order the old per-row loop
+    produced, so evidence row order and invalid-sample order are stable.
+    """
+    src = pd.concat(
+        [base.reset_index(drop=True), value_df.reset_index(drop=True)], axis=1
+    )
+    long = src.melt(
+        id_vars=list(base.columns),
+        value_vars=value_vars,
+        var_name="field",
+        value_name="_val",
+    )
+    return long.sort_values("_row", kind="stable", ignore_index=True)
 
 
 def build_private_observations(
     private_clean: pd.DataFrame,
     build_timestamp: str,
-) -> Tuple[List[Dict[str, Any]], Dict[str, int], Dict[str, int], List[Dict[str, Any]]]:
-    rows: List[Dict[str, Any]] = []
-    counts_by_field: Dict[str, int] = defaultdict(int)
-    parse_fail_by_field: Dict[str, int] = defaultdict(int)
-    invalid_samples: List[Dict[str, Any]] = []
-
-    for _, r in private_clean.iterrows():
-        record_id = r.get("id")
-        source_id = str(int(record_id)) if record_id is not None and not pd.isna(record_id) else "unknown_record"
-        inchikey = r.get("inchikey")
-
-        for field in PRIVATE_FIELDS:
-            val = r.get(field)
-            raw = norm_str(val)
-            if raw is None:
-                continue
-
-            condition_state = infer_condition_state(field)
-            condition_solvent = infer_condition_solvent(r.get("tested_solvent"), condition_state, field)
-            unit = PRIVATE_UNITS.get(field)
-
-            value_num: Optional[float] = None
-            parse_ok = True
-            if field == "absorption_peak_nm":
-                # Enforce float-parsable value string for absorption_peak_nm
-                value_num, parse_ok = safe_float(val)
-                if value_num is None or not parse_ok:
-                    parse_fail_by_field[field] += 1
-                    if len(invalid_samples) < 50:
-                        invalid_samples.append({
-                            "evidence_type": "private_observation",
-                            "source_id": source_id,
-                            "field": field,
-                            "reason": "absorption_peak_nm_parse_failed",
-                            "value": raw,
-                        })
-                    continue
-                raw = str(value_num)
-                unit = "nm"
-            elif field not in {"absorption", "tested_solvent"}:
-                value_num, parse_ok = safe_float(val)
-                if not parse_ok:
-                    parse_fail_by_field[field] += 1
-                    if len(invalid_samples) < 50:
-                        invalid_samples.append({
-                            "evidence_type": "private_observation",
-                            "source_id": source_id,
-                            "field": field,
-                            "reason": "value_num_parse_failed",
-                            "value": raw,
-                        })
-
-            evidence_id = make_evidence_id(
-                evidence_type="private_observation",
-                source_type="private_db",
-                source_id=source_id,
-                field=field,
-                condition_state=condition_state,
-                condition_solvent=condition_solvent,
-            )
-
-            rows.append({
-                "evidence_id": evidence_id,
-                "subject_inchikey": None if pd.isna(inchikey) else inchikey,
-                "evidence_type": "private_observation",
-                "field": field,
-                "value_num": value_num,
-                "value": raw,
-                "unit": unit,
-                "condition_state": condition_state,
-                "condition_solvent": condition_solvent,
-                "source_type": "private_db",
-                "source_id": source_id,
-                "timestamp": build_timestamp,
-                "timestamp_source": None,
-                "confidence": 1.0,
-                "extraction_method": "private_db",
-            })
-
-            counts_by_field[field] += 1
-
-    return rows, dict(counts_by_field), dict(parse_fail_by_field), invalid_samples
+) -> Tuple[pd.DataFrame, Dict[str, int], Dict[str, int], List[Dict[str, Any]]]:
+    fields = [f for f in PRIVATE_FIELDS if f in private_clean.columns]
+
+    # Per-record columns, computed once and broadcast through the melt
+    if "id" in private_clean.columns:
+        id_col = private_clean["id"]
+        source_id = id_col.astype("Int64").astype(str).where(id_col.notna(), "unknown_record")
+    else:
+        source_id = pd.Series("unknown_record", index=private_clean.index)
+    if "tested_solvent" in private_clean.columns:
+        solvent = private_clean["tested_solvent"].astype(str).str.strip()
+        solvent = solvent.where(private_clean["tested_solvent"].notna() & (solvent != ""))
+    else:
+        solvent = pd.Series(np.nan, index=private_clean.index)
+
+    base = pd.DataFrame({
+        "_row": np.arange(len(private_clean)),
+        "source_id": source_id.to_numpy(),
+        "subject_inchikey": (
+            private_clean["inchikey"].to_numpy()
+            if "inchikey" in private_clean.columns
+            else np.full(len(private_clean), None, dtype=object)
+        ),
+        "_solvent": solvent.to_numpy(),
+    })
+    long = _melt_row_major(base, private_clean[fields], fields)
+
+    # norm_str, vectorized: drop NaN and whitespace-only values
+    raw = long["_val"].astype(str).str.strip()
+    raw = raw.where(long["_val"].notna() & (raw != ""))
+    long = long.assign(value=raw)[raw.notna()].reset_index(drop=True)
+
+    long["condition_state"] = long["field"].map(FIELD_TO_STATE)
+    # infer_condition_solvent: the row solvent applies to tested_solvent
+    # itself and to sol-state observations; everything else is unknown
+    sol_scope = (long["field"] == "tested_solvent") | (long["condition_state"] == "sol")
+    long["condition_solvent"] = np.where(sol_scope, long["_solvent"].fillna("unknown"), "unknown")
+
+    # One C-level numeric parse for the whole table replaces per-cell safe_float
+    num = pd.to_numeric(long["_val"], errors="coerce")
+    numeric_field = ~long["field"].isin(("absorption", "tested_solvent"))
+    parse_fail = numeric_field & num.isna()
+
+    parse_fail_by_field = _ordered_counts(fields, long.loc[parse_fail, "field"].value_counts())
+    invalid_samples = [
+        {
+            "evidence_type": "private_observation",
+            "source_id": sid,
+            "field": field,
+            "reason": (
+                "absorption_peak_nm_parse_failed"
+                if field == "absorption_peak_nm"
+                else "value_num_parse_failed"
+            ),
+            "value": value,
+        }
+        for sid, field, value in zip(
+            *(long.loc[parse_fail, c].head(50) for c in ("source_id", "field", "value"))
+        )
+    ]
+
+    # absorption_peak_nm must be float-parsable: drop failures, and store
+    # the parsed float's repr as the value string (as the row loop did)
+    peak = long["field"] == "absorption_peak_nm"
+    long.loc[peak & num.notna(), "value"] = num[peak & num.notna()].astype(str)
+    keep = ~(peak & num.isna())
+    long = long[keep].reset_index(drop=True)
+    num = num[keep].reset_index(drop=True)
+    numeric_field = numeric_field[keep].reset_index(drop=True)
+
+    counts_by_field = _ordered_counts(fields, long["field"].value_counts())
+
+    evidence_ids = make_evidence_ids_bulk(
+        "private_observation|private_db|"
+        + long["source_id"]
+        + "|"
+        + long["field"]
+        + "|"
+        + long["condition_state"]
+        + "|"
+        + long["condition_solvent"]
+    )
+    obs = pd.DataFrame({
+        "evidence_id": pd.Series(evidence_ids, dtype=object),
+        "subject_inchikey": long["subject_inchikey"].to_numpy(),
+        "evidence_type": "private_observation",
+        "field": long["field"].to_numpy(),
+        "value_num": num.where(numeric_field).to_numpy(),
+        "value": long["value"].to_numpy(),
+        "unit": pd.Categorical(long["field"].map(PRIVATE_UNITS)),
+        "condition_state": long["condition_state"].to_numpy(),
+        "condition_solvent": long["condition_solvent"].to_numpy(),
+        "source_type": _const_categorical("private_db", len(long)),
+        "source_id": long["source_id"].to_numpy(),
+        "timestamp": build_timestamp,
+        "timestamp_source": _const_categorical(None, len(long)),
+        "confidence": 1.0,
+        "extraction_method": _const_categorical("private_db", len(long)),
+    })
+
+    return obs, counts_by_field, parse_fail_by_field, invalid_samples
 
 
 def build_atb_observations(
     atb_features: pd.DataFrame,
     atb_qc: pd.DataFrame,
     build_timestamp: str,
-) -> Tuple[List[Dict[str, Any]], Dict[str, int], Dict[str, int], List[Dict[str, Any]]]:
-    rows: List[Dict[str, Any]] = []
-    counts_by_field: Dict[str, int] = defaultdict(int)
-    parse_fail_by_field: Dict[str, int] = defaultdict(int)
-    invalid_samples: List[Dict[str, Any]] = []
-
-    qc_map: Dict[str, Dict[str, Any]] = {}
-    if not atb_qc.empty and "inchikey" in atb_qc.columns:
-        qc_map = atb_qc.set_index("inchikey").to_dict(orient="index")
-
+) -> Tuple[pd.DataFrame, Dict[str, int], Dict[str, int], List[Dict[str, Any]]]:
     feature_cols = [c for c in atb_features.columns if c != "inchikey"]
+    df = atb_features[atb_features["inchikey"].notna()]
+
+    if not atb_qc.empty and "inchikey" in atb_qc.columns and "timestamp" in atb_qc.columns:
+        # Vectorized norm_str + left join; no per-inchikey Python dict
+        qc = atb_qc[["inchikey", "timestamp"]].drop_duplicates("inchikey", keep="last")
+        qc_ts = qc["timestamp"].astype(str).str.strip()
+        qc = qc.assign(timestamp=qc_ts.where(qc["timestamp"].notna() & (qc_ts != "")))
+        ts = df[["inchikey"]].merge(qc, on="inchikey", how="left")["timestamp"]
+    else:
+        ts = pd.Series(np.nan, index=pd.RangeIndex(len(df)))
+    base = pd.DataFrame({
+        "_row": np.arange(len(df)),
+        "subject_inchikey": df["inchikey"].to_numpy(),
+        "timestamp": ts.fillna(build_timestamp).to_numpy(),
+        "timestamp_source": np.where(ts.notna(), "atb_qc", "build_fallback"),
+    })
+    long = _melt_row_major(base, df[feature_cols], feature_cols)
+    long = long[long["_val"].notna()].reset_index(drop=True)
+
+    raw = long["_val"].astype(str).str.strip()
+    long["value"] = raw.where(raw != "")
+
+    num = pd.to_numeric(long["_val"], errors="coerce")
+    parse_fail = num.isna()
+
+    parse_fail_by_field = _ordered_counts(
+        feature_cols, long.loc[parse_fail, "field"].value_counts()
+    )
+    invalid_samples = [
+        {
+            "evidence_type": "atb_computation",
+            "source_id": inchikey,
+            "field": field,
+            "reason": "value_num_parse_failed",
+            # Keep None (not NaN) for empty strings so the manifest stays valid JSON
+            "value": value if pd.notna(value) else None,
+        }
+        for inchikey, field, value in zip(
+            *(long.loc[parse_fail, c].head(50) for c in ("subject_inchikey", "field", "value"))
+        )
+    ]
+
+    counts_by_field = _ordered_counts(feature_cols, long["field"].value_counts())
 
-    for _, r in atb_features.iterrows():
-        inchikey = r.get("inchikey")
-        if inchikey is None or pd.isna(inchikey):
-            continue
-
-        qc = qc_map.get(inchikey, {})
-        qc_ts = norm_str(qc.get("timestamp"))
-        if qc_ts:
-            ts = qc_ts
-            ts_source = "atb_qc"
-        else:
-            ts = build_timestamp
-            ts_source = "build_fallback"
-
-        for field in feature_cols:
-            val = r.get(field)
-            if val is None or (isinstance(val, float) and np.isnan(val)):
-                continue
-
-            raw = norm_str(val)
-            value_num, parse_ok = safe_float(val)
-            if not parse_ok:
-                parse_fail_by_field[field] += 1
-                if len(invalid_samples) < 50:
-                    invalid_samples.append({
-                        "evidence_type": "atb_computation",
-                        "source_id": inchikey,
-                        "field": field,
-                        "reason": "value_num_parse_failed",
-                        "value": raw,
-                    })
-
-            evidence_id = make_evidence_id(
-                evidence_type="atb_computation",
-                source_type="atb_cache",
-                source_id=inchikey,
-                field=field,
-                condition_state="unknown",
-                condition_solvent="unknown",
-            )
-
-            rows.append({
-                "evidence_id": evidence_id,
-                "subject_inchikey": inchikey,
-                "evidence_type": "atb_computation",
-                "field": field,
-                "value_num": value_num,
-                "value": raw,
-                "unit": ATB_UNITS.get(field),
-                "condition_state": "unknown",
-                "condition_solvent": "unknown",
-                "source_type": "atb_cache",
-                "source_id": inchikey,
-                "timestamp": ts,
-                "timestamp_source": ts_source,
-                "confidence": 1.0,
-                "extraction_method": "atb_parser",
-            })
-
-            counts_by_field[field] += 1
-
-    return rows, dict(counts_by_field), dict(parse_fail_by_field), invalid_samples
+    evidence_ids = make_evidence_ids_bulk(
+        "atb_computation|atb_cache|"
+        + long["subject_inchikey"]
+        + "|"
+        + long["field"]
+        + "|unknown|unknown"
+    )
+    unit_by_field = {f: ATB_UNITS.get(f) for f in feature_cols}
+    obs = pd.DataFrame({
+        "evidence_id": pd.Series(evidence_ids, dtype=object),
+        "subject_inchikey": long["subject_inchikey"].to_numpy(),
+        "evidence_type": "atb_computation",
+        "field": long["field"].to_numpy(),
+        "value_num": num.to_numpy(),
+        "value": long["value"].to_numpy(),
+        "unit": pd.Categorical(long["field"].map(unit_by_field)),
+        "condition_state": "unknown",
+        "condition_solvent": "unknown",
+        "source_type": _const_categorical("atb_cache", len(long)),
+        "source_id": long["subject_inchikey"].to_numpy(),
+        "timestamp": long["timestamp"].to_numpy(),
+        "timestamp_source": pd.Categorical(long["timestamp_source"]),
+        "confidence": 1.0,
+        "extraction_method": _const_categorical("atb_parser", len(long)),
+    })
+
+    return obs, counts_by_field, parse_fail_by_field, invalid_samples
 
 
 def write_manifest(
@@ -362,6 +561,134 @@ def write_manifest(
         json.dump(manifest, f, indent=2)
 
 
+def _annotate_quality(df: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Cast enum columns to categoricals and compute quality_flag/score.
+
+    Returns the annotated frame plus the per-row field-kind codes (used
+    again for the out-of-range manifest stat). Validates the output
+    schema and flag labels before returning.
+    """
+    for col in ENUM_COLUMNS:
+        df[col] = df[col].astype("category")
+
+    # Classify each field once (over the category table, not the rows);
+    # the quality rules and the out-of-range manifest mask reuse the
+    # resulting int8 codes instead of re-scanning the column
+    field_cats = df["field"].cat.categories
+    kind_by_cat = np.select(
+        [
+            field_cats.str.startswith("qy_"),
+            field_cats.str.startswith("tau_"),
+            field_cats == "absorption_peak_nm",
+        ],
+        [KIND_QY, KIND_TAU, KIND_ABS_PEAK],
+        default=KIND_OTHER,
+    ).astype(np.int8)
+    kind_codes = kind_by_cat[df["field"].cat.codes.to_numpy()]
+
+    # Quality annotations: preserve raw values; never "fix" numbers.
+    # The rules are mutually exclusive (range checks need a parsed
+    # value_num, the parse warning needs a missing one): a numeric rule
+    # engine over (kind, value_num) plus one precomputed eligibility bit.
+    # Parse warnings stay WARN (not errors) because they come from source
+    # data quality.
+    vnum = df["value_num"].to_numpy(dtype=np.float64)
+    warn_eligible = (
+        df["evidence_type"].isin(["private_observation", "atb_computation"])
+        & df["value"].notna()
+        & (~df["field"].isin(["absorption", "tested_solvent"]))
+    ).to_numpy()
+
+    if _quality_kernel is not None:
+        flag_codes = np.empty(len(df), dtype=np.int8)
+        scores = np.empty(len(df), dtype=np.float64)
+        _quality_kernel(kind_codes, vnum, warn_eligible, flag_codes, scores)
+    else:
+        rule_masks = [
+            (kind_codes == KIND_QY) & (vnum < 0),
+            (kind_codes == KIND_QY) & (vnum > 1),
+            (kind_codes == KIND_TAU) & (vnum > 1e6),
+            (kind_codes == KIND_ABS_PEAK) & (vnum <= 0),
+            np.isnan(vnum) & warn_eligible,
+        ]
+        flag_codes = np.select(rule_masks, [1, 2, 3, 4, 5], default=0).astype(np.int8)
+        scores = np.select(rule_masks, [0.3, 0.3, 0.3, 0.3, 0.7], default=1.0)
+
+    df["quality_flag"] = pd.Categorical(np.asarray(QUALITY_FLAG_LABELS, dtype=object)[flag_codes])
+    df["quality_score"] = scores
+
+    # Basic schema sanity
+    missing = [c for c in REQUIRED_COLS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns in output: {missing}")
+
+    bad_flags = sorted(set(df["quality_flag"].dropna()) - QUALITY_FLAGS)
+    if bad_flags:
+        raise ValueError(f"Invalid quality_flag values: {bad_flags}")
+
+    return df, kind_codes
+
+
+def _accumulate_stats(df: pd.DataFrame, kind_codes: np.ndarray, acc: Dict[str, Any]) -> None:
+    """Fold one annotated chunk's manifest stats into the accumulators."""
+    acc["type"].update(_nonzero_counts(df["evidence_type"]))
+    acc["field"].update(_nonzero_counts(df["field"]))
+    for etype in _nonzero_counts(df["evidence_type"]):
+        acc["type_field"][etype].update(
+            _nonzero_counts(df.loc[df["evidence_type"] == etype, "field"])
+        )
+    acc["quality_flag"].update(_nonzero_counts(df["quality_flag"]))
+
+    out_of_range = (df["quality_flag"] != "OK") & (kind_codes != KIND_OTHER)
+    acc["field_out_of_range"].update(_nonzero_counts(df.loc[out_of_range, "field"]))
+
+    atb_mask = df["evidence_type"] == "atb_computation"
+    if atb_mask.any():
+        acc["atb_ts_source"].update(_nonzero_counts(df.loc[atb_mask, "timestamp_source"]))
+
+    acc["n_sol_unknown"] += int(
+        (df["field"].isin(SOL_FIELDS) & (df["condition_solvent"] == "unknown")).sum()
+    )
+    acc["n_inchikey_null"] += int(df["subject_inchikey"].isna().sum())
+
+
+def _write_parquet_chunks(out_path: Path, chunks: List[pd.DataFrame]) -> None:
+    """
+    Write the chunks as separate row groups of one parquet file.
+
+    Avoids concatenating everything into one frame first (one full extra
+    copy of the table). Categorical columns get their categories aligned
+    across chunks so every chunk maps onto the same Arrow schema.
+    """
+    non_empty = [chunk for chunk in chunks if len(chunk)]
+    if not non_empty:
+        # Nothing to stream; an empty frame still produces a valid file
+        chunks[0].to_parquet(out_path, **PARQUET_WRITE_KWARGS)
+        return
+
+    for col in non_empty[0].columns:
+        if isinstance(non_empty[0][col].dtype, pd.CategoricalDtype):
+            # All-null chunks carry empty float64 categories, which both
+            # union_categoricals and Arrow's dictionary type refuse to
+            # merge with string categories — union only the populated
+            # chunks and re-point the rest at that category set
+            populated = [chunk[col] for chunk in non_empty if len(chunk[col].cat.categories)]
+            if populated:
+                cats = union_categoricals(populated).categories
+            else:
+                cats = pd.Index([], dtype=object)
+            for chunk in non_empty:
+                chunk[col] = chunk[col].cat.set_categories(cats)
+
+    tables = [pa.Table.from_pandas(chunk, preserve_index=False) for chunk in non_empty]
+    with pq.ParquetWriter(
+        out_path, tables[0].schema, compression="zstd", compression_level=3
+    ) as writer:
+        for table in tables:
+            writer.write_table(table, row_group_size=8192)
+
+
 def main():
     parser = argparse.ArgumentParser(description="V1-P1: build evidence_table.parquet from existing sources")
     parser.add_argument("--private-clean", default="data/private_clean.parquet")
@@ -380,120 +707,54 @@ def main():
     logger.info(f"Loading atb_qc: {args.atb_qc}")
     atb_qc = pd.read_parquet(args.atb_qc)
 
-    private_rows, private_counts, private_parse_fails, private_invalid_samples = build_private_observations(
+    private_obs, private_counts, private_parse_fails, private_invalid_samples = build_private_observations(
         private_clean, build_ts
     )
-    atb_rows, atb_counts, atb_parse_fails, atb_invalid_samples = build_atb_observations(
+    atb_obs, atb_counts, atb_parse_fails, atb_invalid_samples = build_atb_observations(
         atb_features, atb_qc, build_ts
     )
 
-    all_rows = private_rows + atb_rows
-    df = pd.DataFrame(all_rows)
-
-    # Quality annotations: preserve raw values; never "fix" numbers.
-    df["quality_flag"] = "OK"
-    df["quality_score"] = 1.0
-
-    # qy_* should be in [0,1]
-    qy = df["field"].astype(str).str.startswith("qy_") & df["value_num"].notna()
-    qy_neg = qy & (df["value_num"] < 0)
-    df.loc[qy_neg, "quality_flag"] = "OUT_OF_RANGE_NEGATIVE"
-    df.loc[qy_neg, "quality_score"] = 0.3
-    qy_gt1 = qy & (df["value_num"] > 1)
-    df.loc[qy_gt1, "quality_flag"] = "OUT_OF_RANGE_GT1"
-    df.loc[qy_gt1, "quality_score"] = 0.3
-
-    # tau_* extreme outliers (ns)
-    tau_ext = df["field"].astype(str).str.startswith("tau_") & df["value_num"].notna() & (df["value_num"] > 1e6)
-    df.loc[tau_ext, "quality_flag"] = "OUTLIER_TAU_EXTREME"
-    df.loc[tau_ext, "quality_score"] = 0.3
-
-    # absorption_peak_nm should be positive
-    abs_peak_bad = (df["field"] == "absorption_peak_nm") & df["value_num"].notna() & (df["value_num"] <= 0)
-    df.loc[abs_peak_bad, "quality_flag"] = "OUT_OF_RANGE_NONPOSITIVE"
-    df.loc[abs_peak_bad, "quality_score"] = 0.3
-
-    # Parse warnings: fields expected to be numeric but value_num couldn't be parsed.
-    # Keep these as WARN (not errors) because they come from source data quality.
-    parse_warn = (
-        (df["quality_flag"] == "OK")
-        & df["evidence_type"].isin(["private_observation", "atb_computation"])
-        & df["value_num"].isna()
-        & df["value"].notna()
-        & (~df["field"].isin(["absorption", "tested_solvent"]))
-    )
-    df.loc[parse_warn, "quality_flag"] = "PARSE_WARNING"
-    df.loc[parse_warn, "quality_score"] = 0.7
-
-    # Basic schema sanity
-    required_cols = [
-        "evidence_id",
-        "subject_inchikey",
-        "evidence_type",
-        "field",
-        "value_num",
-        "value",
-        "unit",
-        "condition_state",
-        "condition_solvent",
-        "source_type",
-        "source_id",
-        "timestamp",
-        "timestamp_source",
-        "confidence",
-        "extraction_method",
-        "quality_flag",
-        "quality_score",
-    ]
-    missing = [c for c in required_cols if c not in df.columns]
-    if missing:
-        raise ValueError(f"Missing required columns in output: {missing}")
-
-    bad_flags = sorted(set(df["quality_flag"].dropna()) - QUALITY_FLAGS)
-    if bad_flags:
-        raise ValueError(f"Invalid quality_flag values: {bad_flags}")
-
-    # Manifest stats
-    counts_by_type = df["evidence_type"].value_counts(dropna=False).to_dict()
-    counts_by_field = df["field"].value_counts(dropna=False).to_dict()
-    counts_by_type_field: Dict[str, Dict[str, int]] = {}
-    for etype, grp in df.groupby("evidence_type"):
-        counts_by_type_field[str(etype)] = grp["field"].value_counts(dropna=False).to_dict()
-
-    counts_by_quality_flag = df["quality_flag"].value_counts(dropna=False).head(10).to_dict()
-    out_of_range_fields_mask = (
-        (df["quality_flag"] != "OK")
-        & (
-            df["field"].astype(str).str.startswith("qy_")
-            | df["field"].astype(str).str.startswith("tau_")
-            | (df["field"] == "absorption_peak_nm")
-        )
-    )
-    counts_by_field_out_of_range = df.loc[out_of_range_fields_mask, "field"].value_counts(dropna=False).to_dict()
-
-    atb_ts_source_counts = (
-        df[df["evidence_type"] == "atb_computation"]["timestamp_source"]
-        .value_counts(dropna=False)
-        .to_dict()
-    )
-    sol_fields = {"emission_sol", "qy_sol", "tau_sol", "absorption_peak_nm", "absorption"}
-    n_sol_unknown_solvent = int(
-        ((df["field"].isin(sol_fields)) & (df["condition_solvent"] == "unknown")).sum()
-    )
+    # Annotate + collect manifest stats chunk by chunk; the chunks are
+    # never concatenated into one combined frame
+    acc: Dict[str, Any] = {
+        "type": Counter(),
+        "field": Counter(),
+        "type_field": defaultdict(Counter),
+        "quality_flag": Counter(),
+        "field_out_of_range": Counter(),
+        "atb_ts_source": Counter(),
+        "n_sol_unknown": 0,
+        "n_inchikey_null": 0,
+    }
+    chunks: List[pd.DataFrame] = []
+    n_rows = 0
+    for obs in (private_obs, atb_obs):
+        obs, kind_codes = _annotate_quality(obs)
+        _accumulate_stats(obs, kind_codes, acc)
+        chunks.append(obs)
+        n_rows += len(obs)
+
+    counts_by_type = dict(acc["type"].most_common())
+    counts_by_field = dict(acc["field"].most_common())
+    counts_by_type_field = {
+        etype: dict(counter.most_common()) for etype, counter in acc["type_field"].items()
+    }
+    counts_by_quality_flag = dict(acc["quality_flag"].most_common(10))
+    counts_by_field_out_of_range = dict(acc["field_out_of_range"].most_common())
 
     invalid_summary = {
-        "n_rows_subject_inchikey_null": int(df["subject_inchikey"].isna().sum()),
+        "n_rows_subject_inchikey_null": acc["n_inchikey_null"],
         "parse_failures_by_field_private": private_parse_fails,
         "parse_failures_by_field_atb": atb_parse_fails,
-        "atb_timestamp_source_counts": atb_ts_source_counts,
-        "n_sol_state_rows_solvent_unknown": n_sol_unknown_solvent,
+        "atb_timestamp_source_counts": dict(acc["atb_ts_source"].most_common()),
+        "n_sol_state_rows_solvent_unknown": acc["n_sol_unknown"],
         "invalid_samples": (private_invalid_samples + atb_invalid_samples)[:50],
     }
 
     out_path = Path(args.output)
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    logger.info(f"Writing evidence_table: {out_path} ({len(df)} rows)")
-    df.to_parquet(out_path, index=False)
+    logger.info(f"Writing evidence_table: {out_path} ({n_rows} rows)")
+    _write_parquet_chunks(out_path, chunks)
 
     manifest_path = Path(args.manifest)
     manifest_path.parent.mkdir(parents=True, exist_ok=True)
@@ -19,12 +19,20 @@ Usage:
 
 import argparse
 import json
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib json fallback below
+    orjson = None
 
 from src.utils.logging import get_logger
 
@@ -32,6 +40,28 @@ from src.utils.logging import get_logger
 logger = get_logger(__name__)
 
 
+# Enum-like evidence columns compared/grouped repeatedly below; cast to
+# categorical once after load so those run on int codes, not re-hashed
+# strings (fresh evidence tables already arrive categorical)
+EVIDENCE_ENUM_COLS = (
+    "evidence_type",
+    "field",
+    "condition_state",
+    "condition_solvent",
+    "source_type",
+)
+
+# Same parquet write options as the evidence/pipeline artifacts: zstd
+# beats the snappy default on these repeated-string tables; pyarrow
+# dictionary-encodes all columns by default, including props_json
+PARQUET_WRITE_KWARGS = dict(
+    engine="pyarrow",
+    compression="zstd",
+    compression_level=3,
+    row_group_size=8192,
+    index=False,
+)
+
 ALLOWED_NODE_TYPES = {"Molecule", "Evidence", "Condition"}
 ALLOWED_EDGE_TYPES = {
     "HAS_OBSERVATION",
@@ -41,6 +71,45 @@ ALLOWED_EDGE_TYPES = {
     "SIMILAR_TO",
 }
 
+# Fixed dtypes for the streamed writers: every batch must map onto the
+# same Arrow schema, so the enum columns carry the full category list
+# (the whole-frame wrappers keep observed-only categories)
+NODE_TYPE_DTYPE = pd.CategoricalDtype(["Molecule", "Evidence", "Condition"])
+REL_TYPE_DTYPE = pd.CategoricalDtype(sorted(ALLOWED_EDGE_TYPES))
+NODE_DTYPES = {"node_id": str, "node_type": NODE_TYPE_DTYPE, "key": str, "props_json": str}
+EDGE_DTYPES = {
+    "src_id": str,
+    "rel_type": REL_TYPE_DTYPE,
+    "dst_id": str,
+    "weight": np.float64,
+    "evidence_id": str,
+    "props_json": str,
+}
+
+# Rows per streamed evidence batch, and the only evidence columns the
+# builders read (intersected against the file schema, so older tables
+# without the quality columns still stream fine)
+_EVIDENCE_BATCH_ROWS = 65536
+_EVIDENCE_READ_COLS = (
+    "evidence_id",
+    "subject_inchikey",
+    "evidence_type",
+    "field",
+    "value",
+    "value_num",
+    "unit",
+    "confidence",
+    "source_type",
+    "source_id",
+    "timestamp",
+    "condition_state",
+    "condition_solvent",
+    "timestamp_source",
+    "extraction_method",
+    "quality_flag",
+    "quality_score",
+)
+
 
 def now_iso() -> str:
     return datetime.now().isoformat()
@@ -56,7 +125,11 @@ def norm_str(val: Any) -> Optional[str]:
 
 
 def json_dumps(obj: Dict[str, Any]) -> str:
-    # Keep ASCII for portability and stable diffs.
+    # Sorted keys for stable diffs. orjson's C encoder is several times
+    # faster than stdlib json and this runs once per node/edge; it emits
+    # UTF-8 instead of ASCII-escaped strings (both are valid JSON).
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS).decode("utf-8")
     return json.dumps(obj, ensure_ascii=True, sort_keys=True)
 
 
@@ -71,99 +144,172 @@ def _py_float(x: Any) -> Optional[float]:
         return None
 
 
-def build_nodes(evidence: pd.DataFrame) -> Tuple[pd.DataFrame, Set[str], Dict[str, int]]:
-    # Molecule nodes (only when inchikey is present)
-    mol_keys = (
-        evidence["subject_inchikey"]
-        .dropna()
-        .astype(str)
-        .map(lambda s: s.strip())
+def _norm_col(s: pd.Series) -> pd.Series:
+    """Vectorized norm_str for a whole column (null where empty/missing)."""
+    out = s.astype(str).str.strip()
+    return out.where(s.notna() & (out != ""))
+
+
+def _norm_col_or_unknown(s: pd.Series) -> pd.Series:
+    """Vectorized norm_str with an "unknown" default for a whole column."""
+    return _norm_col(s).fillna("unknown")
+
+
+def _molecule_node_frame(molecules_set: Set[str]) -> pd.DataFrame:
+    mol_keys = sorted(molecules_set)
+    return pd.DataFrame({
+        "node_id": ["mol:" + ik for ik in mol_keys],
+        "node_type": "Molecule",
+        "key": mol_keys,
+        "props_json": [json_dumps({"inchikey": ik}) for ik in mol_keys],
+    }, columns=["node_id", "node_type", "key", "props_json"])
+
+
+def _condition_node_frame(cond_ids: Iterable[str]) -> pd.DataFrame:
+    # cid is also used as key to keep mapping simple and stable; split
+    # state/solvent back out of the id with one vectorized str.split
+    # instead of a per-id Python split
+    ids = pd.Series(sorted(cond_ids), dtype=object)
+    parts = ids.str.split(":", n=2, expand=True)
+    props = [
+        json_dumps({"condition_state": state, "condition_solvent": solvent})
+        for state, solvent in zip(parts[1], parts[2])
+    ] if len(ids) else []
+    return pd.DataFrame({
+        "node_id": ids,
+        "node_type": "Condition",
+        "key": ids,
+        "props_json": props,
+    }, columns=["node_id", "node_type", "key", "props_json"])
+
+
+def _evidence_node_frame(evidence: pd.DataFrame) -> pd.DataFrame:
+    """
+    Evidence nodes (one per evidence_id) for one evidence chunk.
+
+    Columns are normalized once with the vectorized helpers into object
+    arrays; the only remaining per-row work is assembling the props dict
+    and serializing it, written into a preallocated props_json array.
+    No per-row dict-of-Series, norm_str calls, or dtype re-inference.
+    """
+    node_cols = ["node_id", "node_type", "key", "props_json"]
+    eid = _norm_col(evidence["evidence_id"])
+    n_null = int(eid.isna().sum())
+    if n_null > 0:
+        # This is a build correctness issue (should never happen); keep going but log.
+        logger.warning(f"Found {n_null} null/empty evidence_id rows; skipping their evidence nodes")
+        evidence = evidence[eid.notna()]
+        eid = eid[eid.notna()]
+    if len(evidence) == 0:
+        return pd.DataFrame(columns=node_cols)
+
+    n = len(evidence)
+
+    def str_col(name: str) -> np.ndarray:
+        if name in evidence.columns:
+            # na_value=None so nulls come out as None, not NaN, and the
+            # per-row `is not None` checks below stay correct
+            return _norm_col(evidence[name]).to_numpy(dtype=object, na_value=None)
+        return np.full(n, None, dtype=object)
+
+    def float_col(name: str) -> List[Optional[float]]:
+        if name in evidence.columns:
+            vals = pd.to_numeric(evidence[name], errors="coerce").to_numpy(dtype=np.float64)
+            return [v if v == v else None for v in vals.tolist()]
+        return [None] * n
+
+    cols = (
+        str_col("evidence_type"),
+        str_col("field"),
+        str_col("value"),
+        float_col("value_num"),
+        str_col("unit"),
+        float_col("confidence"),
+        str_col("source_type"),
+        str_col("source_id"),
+        str_col("timestamp"),
+        str_col("condition_state"),
+        _norm_col_or_unknown(evidence["condition_solvent"]).to_numpy(dtype=object)
+        if "condition_solvent" in evidence.columns
+        else np.full(n, "unknown", dtype=object),
     )
-    mol_keys = mol_keys[mol_keys != ""].unique().tolist()
-    molecules_set = set(mol_keys)
-
-    nodes: List[Dict[str, Any]] = []
-
-    for ik in sorted(molecules_set):
-        nodes.append({
-            "node_id": f"mol:{ik}",
-            "node_type": "Molecule",
-            "key": ik,
-            "props_json": json_dumps({"inchikey": ik}),
-        })
-
-    # Evidence nodes (one per evidence_id)
-    has_quality = "quality_flag" in evidence.columns or "quality_score" in evidence.columns
-
-    for _, r in evidence.iterrows():
-        eid = norm_str(r.get("evidence_id"))
-        if eid is None:
-            # This is a build correctness issue (should never happen); keep going but log.
-            logger.warning("Found null/empty evidence_id row; skipping evidence node")
-            continue
 
+    # Optional fields, kept out of props when null to avoid schema
+    # coupling; presence is resolved once per column here, so absent
+    # columns cost nothing in the loop below
+    opt_cols: List[Tuple[str, Any]] = [
+        (name, str_col(name))
+        for name in ("timestamp_source", "extraction_method", "quality_flag")
+        if name in evidence.columns
+    ]
+    if "quality_score" in evidence.columns:
+        opt_cols.append(("quality_score", float_col("quality_score")))
+
+    props_json = np.empty(n, dtype=object)
+    for i, (et, fld, val, vn, unit, conf, st, sid, ts, cstate, csolv) in enumerate(zip(*cols)):
         props: Dict[str, Any] = {
-            "evidence_type": norm_str(r.get("evidence_type")),
-            "field": norm_str(r.get("field")),
-            "value": norm_str(r.get("value")),
-            "value_num": _py_float(r.get("value_num")),
-            "unit": norm_str(r.get("unit")),
-            "confidence": _py_float(r.get("confidence")),
-            "source_type": norm_str(r.get("source_type")),
-            "source_id": norm_str(r.get("source_id")),
-            "timestamp": norm_str(r.get("timestamp")),
-            "condition_state": norm_str(r.get("condition_state")),
-            "condition_solvent": norm_str(r.get("condition_solvent")) or "unknown",
+            "evidence_type": et,
+            "field": fld,
+            "value": val,
+            "value_num": vn,
+            "unit": unit,
+            "confidence": conf,
+            "source_type": st,
+            "source_id": sid,
+            "timestamp": ts,
+            "condition_state": cstate,
+            "condition_solvent": csolv,
         }
+        for key, arr in opt_cols:
+            v = arr[i]
+            if v is not None:
+                props[key] = v
+        props_json[i] = json_dumps(props)
+
+    return pd.DataFrame({
+        "node_id": ("ev:" + eid).to_numpy(),
+        "node_type": "Evidence",
+        "key": eid.to_numpy(),
+        "props_json": props_json,
+    }, columns=node_cols)
+
+
+def _molecule_keys(evidence: pd.DataFrame) -> Set[str]:
+    mol_keys = evidence["subject_inchikey"].dropna().astype(str).str.strip()
+    return set(mol_keys[mol_keys != ""].unique())
+
+
+def _condition_ids(evidence: pd.DataFrame) -> Set[str]:
+    # One vectorized concat + unique instead of a per-row loop
+    return set(
+        (
+            "cond:"
+            + _norm_col_or_unknown(evidence["condition_state"])
+            + ":"
+            + _norm_col_or_unknown(evidence["condition_solvent"])
+        ).unique()
+    )
 
-        # Preserve additional fields when available; keep optional to avoid schema coupling.
-        ts_source = norm_str(r.get("timestamp_source"))
-        if ts_source is not None:
-            props["timestamp_source"] = ts_source
-
-        extraction_method = norm_str(r.get("extraction_method"))
-        if extraction_method is not None:
-            props["extraction_method"] = extraction_method
-
-        if has_quality:
-            qf = norm_str(r.get("quality_flag"))
-            qs = _py_float(r.get("quality_score"))
-            if qf is not None:
-                props["quality_flag"] = qf
-            if qs is not None:
-                props["quality_score"] = qs
-
-        nodes.append({
-            "node_id": f"ev:{eid}",
-            "node_type": "Evidence",
-            "key": eid,
-            "props_json": json_dumps(props),
-        })
-
-    # Condition nodes (dedupe by condition_id)
-    cond_ids: Set[str] = set()
-    for _, r in evidence.iterrows():
-        state = norm_str(r.get("condition_state")) or "unknown"
-        solvent = norm_str(r.get("condition_solvent")) or "unknown"
-        cond_id = f"cond:{state}:{solvent}"
-        cond_ids.add(cond_id)
-
-    for cid in sorted(cond_ids):
-        # cid is also used as key to keep mapping simple and stable.
-        _, state, solvent = cid.split(":", 2)
-        nodes.append({
-            "node_id": cid,
-            "node_type": "Condition",
-            "key": cid,
-            "props_json": json_dumps({"condition_state": state, "condition_solvent": solvent}),
-        })
-
-    df_nodes = pd.DataFrame(nodes, columns=["node_id", "node_type", "key", "props_json"])
+
+def build_nodes(evidence: pd.DataFrame) -> Tuple[pd.DataFrame, Set[str], Dict[str, int]]:
+    molecules_set = _molecule_keys(evidence)
+
+    df_nodes = pd.concat(
+        [
+            _molecule_node_frame(molecules_set),
+            _evidence_node_frame(evidence),
+            _condition_node_frame(_condition_ids(evidence)),
+        ],
+        ignore_index=True,
+    )
+    df_nodes["node_type"] = df_nodes["node_type"].astype("category")
 
     counts_by_type = df_nodes["node_type"].value_counts(dropna=False).to_dict()
 
-    # Basic sanity
-    if df_nodes["node_id"].duplicated().any():
+    # Basic sanity: is_unique is a hashtable cardinality check, no
+    # N-sized boolean mask on the happy path; only compute examples on
+    # the failure branch
+    if not df_nodes["node_id"].is_unique:
         dupes = df_nodes[df_nodes["node_id"].duplicated()]["node_id"].head(5).tolist()
         raise ValueError(f"Duplicate node_id detected (first 5): {dupes}")
     bad_types = sorted(set(df_nodes["node_type"].dropna()) - ALLOWED_NODE_TYPES)
@@ -173,108 +319,132 @@ def build_nodes(evidence: pd.DataFrame) -> Tuple[pd.DataFrame, Set[str], Dict[st
     return df_nodes, molecules_set, counts_by_type
 
 
-def build_edges(
-    evidence: pd.DataFrame,
-    molecules_set: Set[str],
-    anchor_neighbors: pd.DataFrame,
-) -> Tuple[pd.DataFrame, Dict[str, Any]]:
-    edges: List[Dict[str, Any]] = []
+REL_MAP = {
+    "private_observation": "HAS_OBSERVATION",
+    "atb_computation": "HAS_COMPUTATION",
+    "literature_claim": "HAS_EVIDENCECLAIM",
+}
 
-    # Evidence-driven edges
-    rel_map = {
-        "private_observation": "HAS_OBSERVATION",
-        "atb_computation": "HAS_COMPUTATION",
-        "literature_claim": "HAS_EVIDENCECLAIM",
-    }
 
-    n_subject_null_skipped = 0
-
-    for _, r in evidence.iterrows():
-        eid = norm_str(r.get("evidence_id"))
-        if eid is None:
-            continue
-
-        etype = norm_str(r.get("evidence_type")) or ""
-        if etype not in rel_map:
-            raise ValueError(f"Unexpected evidence_type in evidence_table: {etype!r}")
-
-        ik = norm_str(r.get("subject_inchikey"))
-        if ik is None:
-            n_subject_null_skipped += 1
-        else:
-            # Molecule -> Evidence
-            rel_type = rel_map[etype]
-            edges.append({
-                "src_id": f"mol:{ik}",
-                "rel_type": rel_type,
-                "dst_id": f"ev:{eid}",
-                "weight": None,
-                "evidence_id": eid,
-                "props_json": json_dumps({
-                    "field": norm_str(r.get("field")),
-                    "source_type": norm_str(r.get("source_type")),
-                }),
+def _evidence_edge_frames(evidence: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, int]:
+    """
+    Molecule->Evidence and Evidence->Condition edge frames for one
+    evidence chunk, built as whole columns (string concat, map, boolean
+    masks) rather than one dict append per row. Returns the two frames
+    plus the count of rows skipped for a null subject_inchikey.
+    """
+    eid = _norm_col(evidence["evidence_id"])
+    ev = evidence[eid.notna()]
+    eid = eid[eid.notna()]
+
+    rel_type = _norm_col(ev["evidence_type"]).map(REL_MAP)
+    if rel_type.isna().any():
+        bad = sorted(set(_norm_col(ev["evidence_type"])[rel_type.isna()].fillna("")))
+        raise ValueError(f"Unexpected evidence_type in evidence_table: {bad[0]!r}")
+
+    # Molecule -> Evidence (only when the subject molecule exists)
+    ik = _norm_col(ev["subject_inchikey"])
+    has_ik = ik.notna()
+    n_subject_null_skipped = int((~has_ik).sum())
+
+    field_arr = _norm_col(ev["field"]).to_numpy(dtype=object)
+    source_type_arr = _norm_col(ev["source_type"]).to_numpy(dtype=object)
+    has_ik_arr = has_ik.to_numpy()
+    mol_ev = pd.DataFrame({
+        "src_id": ("mol:" + ik[has_ik]).to_numpy(),
+        "rel_type": rel_type[has_ik].to_numpy(),
+        "dst_id": ("ev:" + eid[has_ik]).to_numpy(),
+        "weight": np.nan,
+        "evidence_id": eid[has_ik].to_numpy(),
+        "props_json": [
+            json_dumps({
+                "field": f if isinstance(f, str) else None,
+                "source_type": st if isinstance(st, str) else None,
             })
-
-        # Evidence -> Condition (always)
-        state = norm_str(r.get("condition_state")) or "unknown"
-        solvent = norm_str(r.get("condition_solvent")) or "unknown"
-        cond_id = f"cond:{state}:{solvent}"
-        edges.append({
-            "src_id": f"ev:{eid}",
-            "rel_type": "UNDER_CONDITION",
-            "dst_id": cond_id,
-            "weight": None,
-            "evidence_id": eid,
-            "props_json": json_dumps({}),
-        })
-
-    # Similarity edges (structure-only)
-    kept_sim = 0
-    dropped_missing_nodes = 0
-    dropped_null_keys = 0
-    dropped_bad_weight = 0
-
+            for f, st in zip(field_arr[has_ik_arr], source_type_arr[has_ik_arr])
+        ],
+    })
+
+    # Evidence -> Condition (always)
+    cond_id = (
+        "cond:"
+        + _norm_col_or_unknown(ev["condition_state"])
+        + ":"
+        + _norm_col_or_unknown(ev["condition_solvent"])
+    )
+    ev_cond = pd.DataFrame({
+        "src_id": ("ev:" + eid).to_numpy(),
+        "rel_type": "UNDER_CONDITION",
+        "dst_id": cond_id.to_numpy(),
+        "weight": np.nan,
+        "evidence_id": eid.to_numpy(),
+        "props_json": json_dumps({}),
+    })
+
+    return mol_ev, ev_cond, n_subject_null_skipped
+
+
+def _similarity_edge_frame(
+    anchor_neighbors: pd.DataFrame, molecules_set: Set[str]
+) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    SIMILAR_TO edge frame (structure-only), filtered with one boolean
+    mask pipeline instead of per-row checks; drop counters come from the
+    mask complements so the manifest stays identical.
+    """
     required_cols = {"inchikey", "neighbor_inchikey", "rank", "tanimoto_sim"}
     missing = sorted(required_cols - set(anchor_neighbors.columns))
     if missing:
         raise ValueError(f"anchor_neighbors missing required columns: {missing}")
 
-    for _, r in anchor_neighbors.iterrows():
-        src_ik = norm_str(r.get("inchikey"))
-        dst_ik = norm_str(r.get("neighbor_inchikey"))
-        if src_ik is None or dst_ik is None:
-            dropped_null_keys += 1
-            continue
-        if (src_ik not in molecules_set) or (dst_ik not in molecules_set):
-            dropped_missing_nodes += 1
-            continue
-
-        w = _py_float(r.get("tanimoto_sim"))
-        if w is None or w < 0.0 or w > 1.0:
-            dropped_bad_weight += 1
-            continue
-
-        rank = r.get("rank")
-        try:
-            rank_int = int(rank)
-        except Exception:
-            rank_int = None
-
-        edges.append({
-            "src_id": f"mol:{src_ik}",
-            "rel_type": "SIMILAR_TO",
-            "dst_id": f"mol:{dst_ik}",
-            "weight": w,
-            "evidence_id": None,
-            "props_json": json_dumps({
-                "rank": rank_int,
+    src = _norm_col(anchor_neighbors["inchikey"])
+    dst = _norm_col(anchor_neighbors["neighbor_inchikey"])
+    w = pd.to_numeric(anchor_neighbors["tanimoto_sim"], errors="coerce")
+
+    keys_ok = src.notna() & dst.notna()
+    nodes_ok = keys_ok & src.isin(molecules_set) & dst.isin(molecules_set)
+    weight_ok = w.notna() & w.between(0.0, 1.0)
+    keep = nodes_ok & weight_ok
+
+    # Rank as a nullable int, truncating like int() did for float input
+    rank_num = pd.to_numeric(anchor_neighbors.loc[keep, "rank"], errors="coerce")
+    rank_int = np.trunc(rank_num).astype("Int64")
+    sim_df = pd.DataFrame({
+        "src_id": ("mol:" + src[keep]).to_numpy(),
+        "rel_type": "SIMILAR_TO",
+        "dst_id": ("mol:" + dst[keep]).to_numpy(),
+        "weight": w[keep].to_numpy(),
+        "evidence_id": None,
+        "props_json": [
+            json_dumps({
+                "rank": int(rk) if rk is not pd.NA else None,
                 "metric": "tanimoto_ecfp",
-            }),
-        })
-        kept_sim += 1
+            })
+            for rk in rank_int
+        ],
+    })
+
+    sim_stats = {
+        "total_anchor_rows": int(len(anchor_neighbors)),
+        "kept_similar_to": int(keep.sum()),
+        "dropped_missing_molecule_nodes": int((keys_ok & ~nodes_ok).sum()),
+        "dropped_null_inchikey": int((~keys_ok).sum()),
+        "dropped_bad_weight": int((nodes_ok & ~weight_ok).sum()),
+    }
+    return sim_df, sim_stats
+
+
+def build_edges(
+    evidence: pd.DataFrame,
+    molecules_set: Set[str],
+    anchor_neighbors: pd.DataFrame,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    mol_ev, ev_cond, n_subject_null_skipped = _evidence_edge_frames(evidence)
+    sim_df, sim_stats = _similarity_edge_frame(anchor_neighbors, molecules_set)
 
-    df_edges = pd.DataFrame(edges, columns=["src_id", "rel_type", "dst_id", "weight", "evidence_id", "props_json"])
+    edge_cols = ["src_id", "rel_type", "dst_id", "weight", "evidence_id", "props_json"]
+    df_edges = pd.concat([mol_ev, ev_cond, sim_df], ignore_index=True)[edge_cols]
+    df_edges["rel_type"] = df_edges["rel_type"].astype("category")
     counts_by_rel = df_edges["rel_type"].value_counts(dropna=False).to_dict()
 
     bad_rels = sorted(set(df_edges["rel_type"].dropna()) - ALLOWED_EDGE_TYPES)
@@ -286,13 +456,7 @@ def build_edges(
         "evidence_edges": {
             "n_subject_inchikey_null_skipped_mol_to_ev": n_subject_null_skipped,
         },
-        "similarity_edges": {
-            "total_anchor_rows": int(len(anchor_neighbors)),
-            "kept_similar_to": int(kept_sim),
-            "dropped_missing_molecule_nodes": int(dropped_missing_nodes),
-            "dropped_null_inchikey": int(dropped_null_keys),
-            "dropped_bad_weight": int(dropped_bad_weight),
-        },
+        "similarity_edges": sim_stats,
     }
 
     return df_edges, stats
@@ -304,6 +468,29 @@ def write_manifest(path: Path, manifest: Dict[str, Any]) -> None:
         json.dump(manifest, f, indent=2)
 
 
+def _append_frame(
+    writer: Optional[pq.ParquetWriter], path: Path, df: pd.DataFrame, dtypes: Dict[str, Any]
+) -> Optional[pq.ParquetWriter]:
+    """
+    Append one frame to a multi-row-group parquet file, opening the
+    writer lazily from the first non-empty frame. The fixed `dtypes`
+    (full-category enums, plain strings) guarantee every batch maps onto
+    the same Arrow schema.
+    """
+    if len(df) == 0:
+        return writer
+    table = pa.Table.from_pandas(df.astype(dtypes), preserve_index=False)
+    if writer is None:
+        writer = pq.ParquetWriter(
+            path,
+            table.schema,
+            compression=PARQUET_WRITE_KWARGS["compression"],
+            compression_level=PARQUET_WRITE_KWARGS["compression_level"],
+        )
+    writer.write_table(table, row_group_size=PARQUET_WRITE_KWARGS["row_group_size"])
+    return writer
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="V1-P2: build light graph tables from evidence_table + ECFP neighbors")
     parser.add_argument("--evidence", default="data/evidence_table.parquet")
@@ -315,41 +502,120 @@ def main() -> None:
 
     build_ts = now_iso()
 
-    logger.info(f"Loading evidence_table: {args.evidence}")
-    evidence = pd.read_parquet(args.evidence)
     logger.info(f"Loading anchor_neighbors_ecfp: {args.neighbors}")
     neighbors = pd.read_parquet(args.neighbors)
 
-    nodes_df, molecules_set, node_counts = build_nodes(evidence)
-    edges_df, edge_stats = build_edges(evidence, molecules_set, neighbors)
-
     out_nodes = Path(args.out_nodes)
     out_edges = Path(args.out_edges)
     out_nodes.parent.mkdir(parents=True, exist_ok=True)
     out_edges.parent.mkdir(parents=True, exist_ok=True)
 
-    logger.info(f"Writing graph_nodes: {out_nodes} ({len(nodes_df)} rows)")
-    nodes_df.to_parquet(out_nodes, index=False)
-    logger.info(f"Writing graph_edges: {out_edges} ({len(edges_df)} rows)")
-    edges_df.to_parquet(out_edges, index=False)
+    # Stream the evidence table in row batches instead of loading it
+    # whole: per batch we only need the vectorized per-chunk builders
+    # plus three small cross-batch sets (molecule keys, condition ids,
+    # seen evidence ids). Peak memory is one batch, not the full table.
+    logger.info(f"Streaming evidence_table: {args.evidence}")
+    pf = pq.ParquetFile(args.evidence)
+    read_cols = [c for c in _EVIDENCE_READ_COLS if c in pf.schema_arrow.names]
+
+    molecules_set: Set[str] = set()
+    cond_ids: Set[str] = set()
+    seen_eids: Set[str] = set()
+    node_counts: Counter = Counter()
+    rel_counts: Counter = Counter()
+    n_subject_null_skipped = 0
+    n_evidence_rows = 0
+    nodes_writer: Optional[pq.ParquetWriter] = None
+    edges_writer: Optional[pq.ParquetWriter] = None
+    try:
+        for batch in pf.iter_batches(batch_size=_EVIDENCE_BATCH_ROWS, columns=read_cols):
+            chunk = batch.to_pandas()
+            for col in EVIDENCE_ENUM_COLS:
+                if col in chunk.columns and not isinstance(chunk[col].dtype, pd.CategoricalDtype):
+                    chunk[col] = chunk[col].astype("category")
+            n_evidence_rows += len(chunk)
+
+            molecules_set |= _molecule_keys(chunk)
+            cond_ids |= _condition_ids(chunk)
+
+            ev_nodes = _evidence_node_frame(chunk)
+            # Cheap existence tests first (is_unique / early-exiting
+            # isdisjoint); the full duplicate mask is only built to
+            # report examples on failure
+            if not ev_nodes["key"].is_unique or not seen_eids.isdisjoint(ev_nodes["key"]):
+                dup = ev_nodes["key"].isin(seen_eids) | ev_nodes["key"].duplicated()
+                dupes = ev_nodes.loc[dup, "node_id"].head(5).tolist()
+                raise ValueError(f"Duplicate node_id detected (first 5): {dupes}")
+            seen_eids.update(ev_nodes["key"])
+            node_counts["Evidence"] += len(ev_nodes)
+            nodes_writer = _append_frame(nodes_writer, out_nodes, ev_nodes, NODE_DTYPES)
+
+            mol_ev, ev_cond, n_null = _evidence_edge_frames(chunk)
+            n_subject_null_skipped += n_null
+            rel_counts.update(mol_ev["rel_type"].value_counts().to_dict())
+            rel_counts["UNDER_CONDITION"] += len(ev_cond)
+            for frame in (mol_ev, ev_cond):
+                edges_writer = _append_frame(edges_writer, out_edges, frame, EDGE_DTYPES)
+
+        # Molecule/Condition nodes and similarity edges need the full
+        # molecule set, so they are written after the last batch.
+        mol_nodes = _molecule_node_frame(molecules_set)
+        cond_nodes = _condition_node_frame(cond_ids)
+        node_counts["Molecule"] = len(mol_nodes)
+        node_counts["Condition"] = len(cond_nodes)
+        nodes_writer = _append_frame(nodes_writer, out_nodes, mol_nodes, NODE_DTYPES)
+        nodes_writer = _append_frame(nodes_writer, out_nodes, cond_nodes, NODE_DTYPES)
+
+        sim_df, sim_stats = _similarity_edge_frame(neighbors, molecules_set)
+        rel_counts["SIMILAR_TO"] += len(sim_df)
+        edges_writer = _append_frame(edges_writer, out_edges, sim_df, EDGE_DTYPES)
+    finally:
+        if nodes_writer is not None:
+            nodes_writer.close()
+        if edges_writer is not None:
+            edges_writer.close()
+
+    # Degenerate case: nothing streamed at all — still emit typed empty
+    # tables so downstream readers find the files.
+    if nodes_writer is None:
+        pd.DataFrame(columns=list(NODE_DTYPES)).astype(NODE_DTYPES).to_parquet(
+            out_nodes, **PARQUET_WRITE_KWARGS
+        )
+    if edges_writer is None:
+        pd.DataFrame(columns=list(EDGE_DTYPES)).astype(EDGE_DTYPES).to_parquet(
+            out_edges, **PARQUET_WRITE_KWARGS
+        )
+
+    node_counts = {k: int(v) for k, v in node_counts.most_common() if v > 0}
+    rel_counts = {k: int(v) for k, v in rel_counts.most_common() if v > 0}
+    total_nodes = sum(node_counts.values())
+    total_edges = sum(rel_counts.values())
+    logger.info(f"Wrote graph_nodes: {out_nodes} ({total_nodes} rows)")
+    logger.info(f"Wrote graph_edges: {out_edges} ({total_edges} rows)")
 
     manifest = {
         "build_timestamp": build_ts,
         "inputs": {
             "evidence_table_path": args.evidence,
-            "evidence_table_rows": int(len(evidence)),
+            "evidence_table_rows": int(n_evidence_rows),
             "anchor_neighbors_path": args.neighbors,
             "anchor_neighbors_rows": int(len(neighbors)),
         },
         "nodes": {
             "counts_by_node_type": node_counts,
-            "total_nodes": int(len(nodes_df)),
+            "total_nodes": total_nodes,
         },
         "edges": {
-            "counts_by_rel_type": edge_stats["counts_by_rel_type"],
-            "total_edges": int(len(edges_df)),
+            "counts_by_rel_type": rel_counts,
+            "total_edges": total_edges,
+        },
+        "integrity": {
+            "counts_by_rel_type": rel_counts,
+            "evidence_edges": {
+                "n_subject_inchikey_null_skipped_mol_to_ev": n_subject_null_skipped,
+            },
+            "similarity_edges": sim_stats,
         },
-        "integrity": edge_stats,
     }
     write_manifest(Path(args.manifest), manifest)
     logger.info(f"Wrote manifest: {args.manifest}")
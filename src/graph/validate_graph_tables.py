@@ -18,10 +18,13 @@ Usage:
 """
 
 import argparse
-from typing import Any, Dict, List, Set
+from typing import Any, Dict, List, Optional, Set
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 
 from src.utils.logging import get_logger
 
@@ -32,6 +35,11 @@ logger = get_logger(__name__)
 NODE_COLS = ["node_id", "node_type", "key", "props_json"]
 EDGE_COLS = ["src_id", "rel_type", "dst_id", "weight", "evidence_id", "props_json"]
 
+# Columns the checks actually touch; props_json is only validated for
+# schema presence, so main() never materializes it
+NODE_VALIDATE_COLS = ["node_id", "node_type", "key"]
+EDGE_VALIDATE_COLS = ["src_id", "rel_type", "dst_id", "weight", "evidence_id"]
+
 NODE_TYPES: Set[str] = {"Molecule", "Evidence", "Condition"}
 REL_TYPES: Set[str] = {
     "HAS_OBSERVATION",
@@ -52,11 +60,30 @@ def _is_null(x: Any) -> bool:
     return False
 
 
-def validate(nodes: pd.DataFrame, edges: pd.DataFrame) -> List[str]:
+def _in_node_ids(series: pd.Series, node_id_arr: pa.Array) -> np.ndarray:
+    """
+    Membership of a whole id column in the node-id set via Arrow's
+    hashed is_in kernel — no Python __contains__ hashing per row.
+    Nulls count as missing (False), as set membership did.
+    """
+    mask = pc.is_in(pa.array(series, from_pandas=True), value_set=node_id_arr)
+    return pc.fill_null(mask, False).to_numpy(zero_copy_only=False)
+
+
+def validate(
+    nodes: pd.DataFrame,
+    edges: pd.DataFrame,
+    node_columns: Optional[List[str]] = None,
+    edge_columns: Optional[List[str]] = None,
+) -> List[str]:
     errors: List[str] = []
 
-    missing_nodes = [c for c in NODE_COLS if c not in nodes.columns]
-    missing_edges = [c for c in EDGE_COLS if c not in edges.columns]
+    # Schema presence is checked against the file schema when given
+    # (main() projects the frames down to the validated columns only)
+    node_columns = list(nodes.columns) if node_columns is None else node_columns
+    edge_columns = list(edges.columns) if edge_columns is None else edge_columns
+    missing_nodes = [c for c in NODE_COLS if c not in node_columns]
+    missing_edges = [c for c in EDGE_COLS if c not in edge_columns]
     if missing_nodes:
         errors.append(f"Missing node columns: {missing_nodes}")
     if missing_edges:
@@ -64,70 +91,88 @@ def validate(nodes: pd.DataFrame, edges: pd.DataFrame) -> List[str]:
     if errors:
         return errors
 
+    # One plain-string cast per id column up front (zero-copy when the
+    # reader already produced string dtype, as the builder's files do);
+    # the checks below reuse them without per-check astype copies.
+    # Nulls survive the cast, so isna()/concat semantics are unchanged.
+    nodes = nodes.astype({"node_id": str})
+    edges = edges.astype({c: str for c in ("src_id", "dst_id", "evidence_id") if c in edges.columns})
+
     # Node checks
     if nodes["node_id"].isna().any():
         errors.append(f"node_id has nulls: {int(nodes['node_id'].isna().sum())}")
-    dup = int(nodes["node_id"].duplicated().sum())
-    if dup > 0:
-        examples = nodes.loc[nodes["node_id"].duplicated(), "node_id"].astype(str).head(5).tolist()
-        errors.append(f"node_id has {dup} duplicates (examples={examples})")
+    # is_unique avoids materializing the boolean duplicate mask on the
+    # (usual) all-unique path; the mask is only built to report
+    if not nodes["node_id"].is_unique:
+        dup_mask = nodes["node_id"].duplicated()
+        examples = nodes.loc[dup_mask, "node_id"].head(5).tolist()
+        errors.append(f"node_id has {int(dup_mask.sum())} duplicates (examples={examples})")
 
     bad_types = sorted(set(nodes["node_type"].dropna()) - NODE_TYPES)
     if bad_types:
         errors.append(f"Invalid node_type values: {bad_types}")
 
-    node_type_map: Dict[str, str] = dict(zip(nodes["node_id"].astype(str), nodes["node_type"].astype(str)))
-    node_ids = set(node_type_map.keys())
+    # node_id -> node_type as a Series so type lookups are vectorized
+    # reindex calls, not a Python lambda per edge; duplicate node ids are
+    # reported above, keep the first so reindex stays well-defined
+    node_type_series = pd.Series(
+        nodes["node_type"].astype(str).to_numpy(), index=nodes["node_id"].to_numpy()
+    )
+    node_type_series = node_type_series[~node_type_series.index.duplicated()]
+    # Node-id membership set as an Arrow array: the is_in passes below
+    # run against Arrow's hashed set natively
+    node_id_arr = pa.array(node_type_series.index.to_numpy(dtype=object), type=pa.string())
 
     # Edge checks
     bad_rels = sorted(set(edges["rel_type"].dropna()) - REL_TYPES)
     if bad_rels:
         errors.append(f"Invalid rel_type values: {bad_rels}")
 
-    src_missing = edges[~edges["src_id"].astype(str).isin(node_ids)]
+    src_missing = edges[~_in_node_ids(edges["src_id"], node_id_arr)]
     if len(src_missing) > 0:
-        examples = src_missing["src_id"].astype(str).head(5).tolist()
+        examples = src_missing["src_id"].head(5).tolist()
         errors.append(f"Edges with missing src_id nodes: {len(src_missing)} (examples={examples})")
 
-    dst_missing = edges[~edges["dst_id"].astype(str).isin(node_ids)]
+    dst_missing = edges[~_in_node_ids(edges["dst_id"], node_id_arr)]
     if len(dst_missing) > 0:
-        examples = dst_missing["dst_id"].astype(str).head(5).tolist()
+        examples = dst_missing["dst_id"].head(5).tolist()
         errors.append(f"Edges with missing dst_id nodes: {len(dst_missing)} (examples={examples})")
 
     # Evidence edges must have evidence_id and refer to an Evidence node
     evidence_edges = edges[edges["rel_type"].isin(EVIDENCE_RELS)]
     if len(evidence_edges) > 0:
-        missing_eid = evidence_edges["evidence_id"].isna() | (evidence_edges["evidence_id"].astype(str).str.strip() == "")
+        missing_eid = evidence_edges["evidence_id"].isna() | (evidence_edges["evidence_id"].str.strip() == "")
         if missing_eid.any():
             examples = evidence_edges.loc[missing_eid, "rel_type"].astype(str).head(5).tolist()
             errors.append(f"Evidence edges with null/empty evidence_id: {int(missing_eid.sum())} (examples rel_type={examples})")
 
         # Evidence node existence: ev:{evidence_id}
-        ev_node_ids = ("ev:" + evidence_edges["evidence_id"].astype(str)).tolist()
-        missing_ev_nodes = [ev for ev in ev_node_ids if ev not in node_ids]
-        if missing_ev_nodes:
-            errors.append(f"Evidence edges refer to missing Evidence nodes: {len(missing_ev_nodes)} (examples={missing_ev_nodes[:5]})")
+        ev_node_ids = "ev:" + evidence_edges["evidence_id"]
+        missing_ev = ~_in_node_ids(ev_node_ids, node_id_arr)
+        if missing_ev.any():
+            examples = ev_node_ids[missing_ev].head(5).tolist()
+            errors.append(f"Evidence edges refer to missing Evidence nodes: {int(missing_ev.sum())} (examples={examples})")
 
         # Structural consistency checks
         has_edges = edges[edges["rel_type"].isin({"HAS_OBSERVATION", "HAS_COMPUTATION", "HAS_EVIDENCECLAIM"})]
         if len(has_edges) > 0:
-            bad_dst = has_edges["dst_id"].astype(str) != ("ev:" + has_edges["evidence_id"].astype(str))
+            bad_dst = has_edges["dst_id"] != ("ev:" + has_edges["evidence_id"])
             if bad_dst.any():
-                examples = has_edges.loc[bad_dst, "dst_id"].astype(str).head(5).tolist()
+                examples = has_edges.loc[bad_dst, "dst_id"].head(5).tolist()
                 errors.append(f"HAS_* edges with dst_id != ev:evidence_id: {int(bad_dst.sum())} (examples dst_id={examples})")
 
         under = edges[edges["rel_type"] == "UNDER_CONDITION"]
         if len(under) > 0:
-            bad_src = under["src_id"].astype(str) != ("ev:" + under["evidence_id"].astype(str))
+            bad_src = under["src_id"] != ("ev:" + under["evidence_id"])
             if bad_src.any():
-                examples = under.loc[bad_src, "src_id"].astype(str).head(5).tolist()
+                examples = under.loc[bad_src, "src_id"].head(5).tolist()
                 errors.append(f"UNDER_CONDITION edges with src_id != ev:evidence_id: {int(bad_src.sum())} (examples src_id={examples})")
 
             # dst must be Condition
-            dst_types = under["dst_id"].astype(str).map(lambda nid: node_type_map.get(nid))
+            dst_types = node_type_series.reindex(under["dst_id"].to_numpy()).to_numpy()
             bad_dst_type = dst_types != "Condition"
             if bad_dst_type.any():
-                examples = under.loc[bad_dst_type, "dst_id"].astype(str).head(5).tolist()
+                examples = under.loc[bad_dst_type, "dst_id"].head(5).tolist()
                 errors.append(f"UNDER_CONDITION edges with dst not Condition: {int(bad_dst_type.sum())} (examples dst_id={examples})")
 
     # SIMILAR_TO constraints
@@ -136,7 +181,7 @@ def validate(nodes: pd.DataFrame, edges: pd.DataFrame) -> List[str]:
         # evidence_id should be null
         bad_eid = ~(sim["evidence_id"].isna())
         if bad_eid.any():
-            examples = sim.loc[bad_eid, "evidence_id"].astype(str).head(5).tolist()
+            examples = sim.loc[bad_eid, "evidence_id"].head(5).tolist()
             errors.append(f"SIMILAR_TO edges with non-null evidence_id: {int(bad_eid.sum())} (examples={examples})")
 
         w = sim["weight"]
@@ -145,8 +190,10 @@ def validate(nodes: pd.DataFrame, edges: pd.DataFrame) -> List[str]:
             examples = sim.loc[bad_w, ["src_id", "dst_id", "weight"]].head(5).to_dict(orient="records")
             errors.append(f"SIMILAR_TO edges with invalid weight: {int(bad_w.sum())} (examples={examples})")
 
-        src_types = sim["src_id"].astype(str).map(lambda nid: node_type_map.get(nid))
-        dst_types = sim["dst_id"].astype(str).map(lambda nid: node_type_map.get(nid))
+        # Compare as arrays: the reindexed Series are indexed by node id,
+        # so combining them directly would re-align on those labels
+        src_types = node_type_series.reindex(sim["src_id"].to_numpy()).to_numpy()
+        dst_types = node_type_series.reindex(sim["dst_id"].to_numpy()).to_numpy()
         bad_types = (src_types != "Molecule") | (dst_types != "Molecule")
         if bad_types.any():
             examples = sim.loc[bad_types, ["src_id", "dst_id"]].head(5).to_dict(orient="records")
@@ -168,10 +215,21 @@ def main() -> None:
     parser.add_argument("--edges", default="data/graph_edges.parquet")
     args = parser.parse_args()
 
-    nodes = pd.read_parquet(args.nodes)
-    edges = pd.read_parquet(args.edges)
+    # Project the reads down to the validated columns: props_json is the
+    # heaviest column in both files and no check materializes it, so the
+    # schema names come from the parquet footer instead
+    node_schema_cols = pq.read_schema(args.nodes).names
+    edge_schema_cols = pq.read_schema(args.edges).names
+    nodes = pd.read_parquet(args.nodes, columns=[c for c in NODE_VALIDATE_COLS if c in node_schema_cols])
+    edges = pd.read_parquet(args.edges, columns=[c for c in EDGE_VALIDATE_COLS if c in edge_schema_cols])
+    # Enum columns as categoricals: comparisons and counts below run on
+    # int codes (no-op when the builder already wrote them categorical)
+    if "node_type" in nodes.columns:
+        nodes["node_type"] = nodes["node_type"].astype("category")
+    if "rel_type" in edges.columns:
+        edges["rel_type"] = edges["rel_type"].astype("category")
     print_summary(nodes, edges)
-    errors = validate(nodes, edges)
+    errors = validate(nodes, edges, node_columns=node_schema_cols, edge_columns=edge_schema_cols)
     if errors:
         logger.error("VALIDATION FAILED")
         for e in errors[:30]:
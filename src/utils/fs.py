@@ -0,0 +1,42 @@
+"""
+src/utils/fs.py
+
+Filesystem helpers.
+"""
+
+from pathlib import Path
+
+# Directories this process has already created (or verified to exist).
+# mkdir with exist_ok=True is idempotent, so the set only exists to skip
+# redundant mkdirat syscalls on batch re-runs; staleness (a directory
+# removed externally mid-process) is not a supported scenario.
+_MKDIR_CACHE: set = set()
+
+
+def ensure_dir(path: Path) -> None:
+    """mkdir -p that skips the syscall for directories already created."""
+    s = str(path)
+    if s in _MKDIR_CACHE:
+        return
+    path.mkdir(parents=True, exist_ok=True)
+    _MKDIR_CACHE.add(s)
+
+
+def write_if_changed(path: Path, content: bytes) -> bool:
+    """
+    Write bytes only when the on-disk content differs.
+
+    Saves the write + inode update on bulk re-runs where small audit
+    files (e.g. canonical_smiles.txt) are rewritten with identical
+    content per molecule.
+
+    Returns:
+        True if the file was written, False if it was already current
+    """
+    try:
+        if path.read_bytes() == content:
+            return False
+    except FileNotFoundError:
+        pass
+    path.write_bytes(content)
+    return True
@@ -0,0 +1,46 @@
+"""
+src/utils/jsonio.py
+
+Small JSON file helpers shared by cache readers/writers.
+
+Uses orjson when available (stdlib json fallback), and atomic writes
+(temp file + os.replace) so a concurrent reader never observes a
+half-written status.json.
+"""
+
+import json
+import os
+from typing import Any, Dict
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+
+def read_json(path) -> Dict[str, Any]:
+    """Read a small JSON file (orjson when available; stdlib fallback)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_json_atomic(path, obj: Dict[str, Any]) -> None:
+    """
+    Write a small JSON file with 2-space indent, atomically.
+
+    The payload goes to {path}.tmp first and is moved into place with
+    os.replace, which is atomic on POSIX (and NTFS) — readers see either
+    the old file or the new one, never a torn write.
+    """
+    if orjson is not None:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(obj, indent=2).encode()
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
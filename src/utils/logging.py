@@ -2,6 +2,10 @@
 src/utils/logging.py
 
 Basic logging setup for the Uncertainty-aware AIE pipeline.
+
+Handlers live on the root logger only; module loggers propagate to it.
+This keeps one StreamHandler/Formatter for the whole process instead of
+one per module (which duplicated formatter work on every record).
 """
 
 import logging
@@ -9,56 +13,67 @@ import sys
 from typing import Optional
 
 
-def setup_logger(
-    name: str,
+DEFAULT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+def _configure_root(
     level: str = "INFO",
     log_file: Optional[str] = None,
     format_string: Optional[str] = None,
-) -> logging.Logger:
-    """
-    Set up a logger with console and optional file output.
+) -> None:
+    """Attach the shared handlers to the root logger (idempotent)."""
+    root = logging.getLogger()
 
-    Args:
-        name: Logger name (typically __name__ from calling module)
-        level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
-        log_file: Optional path to log file. If None, logs to console only.
-        format_string: Optional custom format string. If None, uses default.
-
-    Returns:
-        Configured logger instance
-    """
-    logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, level.upper()))
+    # Avoid duplicate handlers (and level churn) if already configured
+    if root.handlers:
+        return
 
-    # Avoid duplicate handlers if logger already configured
-    if logger.handlers:
-        return logger
+    root.setLevel(getattr(logging, level.upper()))
 
-    # Default format
-    if format_string is None:
-        format_string = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-
-    formatter = logging.Formatter(format_string)
+    formatter = logging.Formatter(format_string or DEFAULT_FORMAT)
 
     # Console handler (stdout)
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(getattr(logging, level.upper()))
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    root.addHandler(console_handler)
 
     # Optional file handler
     if log_file:
         file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(getattr(logging, level.upper()))
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        root.addHandler(file_handler)
+
 
-    return logger
+def setup_logger(
+    name: str,
+    level: str = "INFO",
+    log_file: Optional[str] = None,
+    format_string: Optional[str] = None,
+) -> logging.Logger:
+    """
+    Set up logging with console and optional file output.
+
+    Configures the root logger (once) and returns the named child, which
+    inherits level and handlers via propagation.
+
+    Args:
+        name: Logger name (typically __name__ from calling module)
+        level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        log_file: Optional path to log file. If None, logs to console only.
+        format_string: Optional custom format string. If None, uses default.
+
+    Returns:
+        Logger instance for `name`
+    """
+    _configure_root(level=level, log_file=log_file, format_string=format_string)
+    return logging.getLogger(name)
 
 
 def get_logger(name: str) -> logging.Logger:
     """
-    Get a logger instance. If not already configured, sets up with default INFO level.
+    Get a logger instance. Ensures the root logger is configured with
+    default INFO level; the returned logger carries no handlers of its
+    own and propagates to the shared root handler.
 
     Args:
         name: Logger name (typically __name__)
@@ -66,8 +81,5 @@ def get_logger(name: str) -> logging.Logger:
     Returns:
         Logger instance
     """
-    logger = logging.getLogger(name)
-    if not logger.handlers:
-        # Set up with defaults if not already configured
-        return setup_logger(name, level="INFO")
-    return logger
+    _configure_root(level="INFO")
+    return logging.getLogger(name)
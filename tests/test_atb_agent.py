@@ -30,13 +30,32 @@ class TestATBAgent:
         return ATBAgent(cache_dir=temp_cache_dir)
 
     def test_get_cache_path(self, agent):
-        """Test cache path generation with 2-char prefix."""
+        """Test cache path generation with hashed shard prefix."""
+        import hashlib
+
         inchikey = "ABCDEFGHIJ-KLMNOPQRST-U"
         cache_path = agent.get_cache_path(inchikey)
 
-        # Check structure: cache_dir/AB/ABCDEFGHIJ-KLMNOPQRST-U/
+        # Check structure: cache_dir/{blake2b 2-hex-char shard}/{inchikey}/
+        expected_prefix = hashlib.blake2b(inchikey.encode(), digest_size=1).hexdigest()
         assert cache_path.name == inchikey
-        assert cache_path.parent.name == "AB"
+        assert cache_path.parent.name == expected_prefix
+
+    def test_migrate_layout(self, agent, temp_cache_dir):
+        """Test one-shot migration from v1 (inchikey[:2]) to v2 (hashed) layout."""
+        inchikey = "ABCDEFGHIJ-KLMNOPQRST-U"
+
+        # Build a v1-layout entry by hand
+        old_dir = Path(temp_cache_dir) / inchikey[:2] / inchikey
+        old_dir.mkdir(parents=True)
+        (old_dir / "status.json").write_text("{}")
+
+        result = agent.migrate_layout()
+
+        assert result["migrated"] == 1
+        assert not old_dir.exists()
+        assert (agent.get_cache_path(inchikey) / "status.json").exists()
+        assert (Path(temp_cache_dir) / "layout_version").read_text().strip() == "2"
 
     def test_get_cache_path_invalid_inchikey(self, agent):
         """Test cache path generation with invalid InChIKey."""
@@ -127,6 +146,17 @@ class TestATBAgent:
         # Now cache should exist
         assert agent.check_cache(inchikey) is True
 
+    def test_check_cache_bulk(self, agent):
+        """Test bulk cache existence check."""
+        cached_key = "TESTINCHIK-EYBULKCACHED-A"
+        missing_key = "TESTINCHIK-EYBULKMISSIN-G"
+
+        agent.mark_pending(cached_key)
+
+        result = agent.check_cache_bulk([cached_key, missing_key, ""])
+
+        assert result == {cached_key}
+
     def test_load_status(self, agent):
         """Test loading status.json."""
         inchikey = "TESTINCHIK-EYLOADSTATUS-T"
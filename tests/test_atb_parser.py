@@ -7,12 +7,17 @@ Tests for AIE-aTB result.json parsing.
 import pytest
 import json
 import tempfile
+from io import BytesIO
 from pathlib import Path
 
+import numpy as np
+
 from src.chem.atb_parser import (
+    FEATURE_COLUMNS,
     parse_result_json,
     detect_fail_stage,
     extract_features,
+    extract_features_batch,
     compute_charge_dipole,
     save_features_json,
 )
@@ -55,15 +60,13 @@ class TestATBParser:
         }
 
     @pytest.fixture
-    def temp_result_file(self, sample_result):
-        """Create temporary result.json file."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump(sample_result, f)
-            return Path(f.name)
+    def result_buffer(self, sample_result):
+        """In-memory result.json buffer (no temp file / disk syscalls)."""
+        return BytesIO(json.dumps(sample_result).encode())
 
-    def test_parse_result_json_success(self, temp_result_file):
+    def test_parse_result_json_success(self, result_buffer):
         """Test successful parsing of result.json."""
-        features, fail_stage = parse_result_json(temp_result_file)
+        features, fail_stage = parse_result_json(result_buffer)
 
         assert fail_stage is None
         assert features is not None
@@ -80,11 +83,7 @@ class TestATBParser:
 
     def test_parse_result_json_invalid_json(self):
         """Test parsing of invalid JSON."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            f.write("{ invalid json }")
-            path = Path(f.name)
-
-        features, fail_stage = parse_result_json(path)
+        features, fail_stage = parse_result_json(b"{ invalid json }")
 
         assert features is None
         assert fail_stage == "feature_parse"
@@ -157,6 +156,25 @@ class TestATBParser:
         assert compute_charge_dipole({}) is None
         assert compute_charge_dipole({"element": []}) is None
 
+    def test_extract_features_batch_matches_scalar(self, sample_result):
+        """Test batch extraction parity with the scalar path."""
+        # Second result with a missing field to exercise NaN handling
+        partial = json.loads(json.dumps(sample_result))
+        del partial["excited_state"]["volume"]
+
+        batch = extract_features_batch([sample_result, partial])
+
+        assert set(batch.keys()) == set(FEATURE_COLUMNS)
+        for row_idx, result in enumerate([sample_result, partial]):
+            scalar = extract_features(result)
+            for name in FEATURE_COLUMNS:
+                expected = scalar[name]
+                got = batch[name][row_idx]
+                if expected is None:
+                    assert np.isnan(got), f"{name}[{row_idx}] should be NaN"
+                else:
+                    assert got == pytest.approx(expected), f"{name}[{row_idx}]"
+
     def test_save_features_json(self, sample_result):
         """Test saving features.json."""
         features = extract_features(sample_result)
@@ -1,13 +1,20 @@
 from PyAmesp import Amesp
-from ase import io
+from ase import Atoms, io
 from ase.mep import NEB
-<<<<<<< HEAD
 from ase.optimize import BFGS
-=======
-from ase.optimize import LBFGS
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
 from pathlib import Path
 
+# Work directories already created by this process: NEB builds one
+# calculator per image and restarts rebuild calculators for the same
+# tree, so skip the repeated mkdir syscalls.
+_workdirs_created = set()
+
+def _ensure_workdir(work_dir):
+    key = str(work_dir)
+    if key not in _workdirs_created:
+        work_dir.mkdir(parents=True, exist_ok=True)
+        _workdirs_created.add(key)
+
 # -------------------- return the PyAmesp calculator --------------------
 def make_amesp_calc(atoms, args,calculation_type,idx=None):
     """
@@ -18,30 +25,22 @@ def make_amesp_calc(atoms, args,calculation_type,idx=None):
     if calculation_type == "opt":
         # define a work_dirs/opt/
         work_dir = Path(f"{args.workdir}/opt/")
-        work_dir.mkdir(parents=True, exist_ok=True)
+        _ensure_workdir(work_dir)
         label_path = work_dir / "opt_run"
 
         # define calculate options
         keywords=["atb", "opt","force"]
-<<<<<<< HEAD
         opt = {'maxcyc': 2000, 'gediis': 'off', 'maxstep' : 0.3}
-=======
-        opt = {'maxcyc': 2000, 'gediis': 'off', 'maxstep' : 0.1,'geomtol': 'loose'}
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
 
     elif calculation_type == "excit":
         # define a work_dirs/excit/
         work_dir = Path(f"{args.workdir}/excit/")
-        work_dir.mkdir(parents=True, exist_ok=True)
+        _ensure_workdir(work_dir)
         label_path = work_dir / "excit_run"
 
         # define calculate options
         keywords=["atb", "tda", 'opt',"force"]
-<<<<<<< HEAD
         opt = {'maxcyc': 2000, 'gediis': 'off', 'maxstep' : 0.3}
-=======
-        opt = {'maxcyc': 2000, 'gediis': 'off', 'maxstep' : 0.1,'geomtol': 'loose'}
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
         posthf = {'nstates': args.nstates, 'root': args.excit_root}
     
     elif calculation_type == "neb" :
@@ -50,18 +49,15 @@ def make_amesp_calc(atoms, args,calculation_type,idx=None):
         else:
             # define a work_dirs/neb_img_XX/
             work_dir = Path(f"{args.workdir}/neb/neb_img_{idx:02d}/")
-            work_dir.mkdir(parents=True, exist_ok=True)
+            _ensure_workdir(work_dir)
             label_path = work_dir / "neb_run"
 
             # define calculate options
             keywords=["atb", "force"]
             opt = None  
     
-<<<<<<< HEAD
     # Get charge from args (auto-detected or provided), default to 0 if not set
     charge = getattr(args, 'charge', 0) if hasattr(args, 'charge') and args.charge is not None else 0
-=======
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
 
     calc = Amesp(
         atoms=atoms,
@@ -69,11 +65,7 @@ def make_amesp_calc(atoms, args,calculation_type,idx=None):
         command="amesp PREFIX.aip",
         npara=args.npara,
         maxcore=args.maxcore,
-<<<<<<< HEAD
         charge=charge, mult=int(args.mult),
-=======
-        charge=args.charge, mult=int(args.mult),
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
         keywords=keywords,
         opt = opt,
         scf = {'maxcyc':2000,'vshift': 500},
@@ -127,23 +119,21 @@ def run_calculate(args, type, begin_atoms, log, end_atoms=None):
         neb.interpolate(method="idpp")
         log.debug("NEB object created and interpolated using IDPP method")
         
-        # 4. Initialize optimizer and run NEB calculation
-<<<<<<< HEAD
-        dyn = BFGS(neb, 
-                   trajectory=f"{args.workdir}/neb/neb.traj", 
+        # 4. Initialize optimizer and run NEB calculation.
+        # Buffer the trajectory in memory and flush once after the run:
+        # the ASE trajectory writer emits one frame per image per BFGS
+        # step, and those many small appends dominate I/O on slow
+        # filesystems. Per-step energies stay available in neb.log.
+        frames = []
+        dyn = BFGS(neb,
                    logfile=f"{args.workdir}/neb/neb.log",
                    maxstep=0.1)
-=======
-        dyn = LBFGS(neb, 
-                   trajectory=f"{args.workdir}/neb/neb.traj", 
-                   logfile=f"{args.workdir}/neb/neb.log",
-                   maxstep=0.05,
-                   memory=200
-                   )
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
+        dyn.attach(lambda: frames.extend(img.copy() for img in images))
         log.info("Running NEB optimization...")
         dyn.run(fmax=args.neb_fmax)
-        
+        io.write(f"{args.workdir}/neb/neb.traj", frames)
+        log.debug(f"NEB trajectory written in one flush ({len(frames)} frames)")
+
         log.info("NEB calculation completed successfully")
         return images
         
@@ -166,19 +156,25 @@ def run_calculate(args, type, begin_atoms, log, end_atoms=None):
         elements, positions = atoms.calc.read_results()
         log.debug(f"Results obtained for {len(elements[-1])} atoms")
         
-        # Write optimized structure to XYZ file
+        # Write optimized structure to XYZ file (audit artifact; the
+        # returned Atoms is built in-memory below, not read back from it)
         output_file = f"{args.workdir}/{type}/{type}ed.xyz"
+        # Format all lines first and emit one write() instead of one
+        # syscall per atom
+        lines = [f"{len(elements[-1])}\n", "Generated from AOP output\n"]
+        lines.extend(
+            f"{elem:2s} {pos[0]:12.6f} {pos[1]:12.6f} {pos[2]:12.6f}\n"
+            for elem, pos in zip(elements[-1], positions[-1])
+        )
         with open(output_file, 'w') as f:
-            f.write(f"{len(elements[-1])}\n")
-            f.write("Generated from AOP output\n")
-            for elem, pos in zip(elements[-1], positions[-1]):
-                f.write(f"{elem:2s} {pos[0]:12.6f} {pos[1]:12.6f} {pos[2]:12.6f}\n")
+            f.write("".join(lines))
         log.debug(f"Optimized structure written to {output_file}")
-        
-        # Read back the optimized structure
-        atoms = io.read(output_file)
+
+        # Build the optimized structure directly from calculator state
+        # instead of re-parsing the XYZ we just wrote
+        atoms = Atoms(symbols=elements[-1], positions=positions[-1])
         log.info(f"{type} calculation completed successfully")
-        
+
         return atoms
     
 def volume_Mutifwfn(xyz):
@@ -188,16 +184,29 @@ def volume_Mutifwfn(xyz):
     """
     cmd = "Multiwfn"
     stdin = f"{xyz}\n12\n0\nq\n"
-    out = subprocess.run(cmd, input=stdin, text=True, capture_output=True)
-    for line in out.stdout.splitlines():
-        if line.strip().startswith("Volume:"):
-            parts = line.split('(')
-            parts = parts[-1].split(')')
-            parts = parts[0].strip().split()
-
-            if "Angstrom^3" in line:
-                    idx = parts.index("Angstrom^3")
-                    return float(parts[idx-1])
+    # Stream stdout line-by-line and stop at the Volume: line instead of
+    # buffering the full Multiwfn log (MBs for large molecules) and
+    # re-scanning it with splitlines().
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            text=True)
+    vol = None
+    try:
+        proc.stdin.write(stdin)
+        proc.stdin.close()
+        for line in proc.stdout:
+            if line.strip().startswith("Volume:") and "Angstrom^3" in line:
+                parts = line.split('(')
+                parts = parts[-1].split(')')
+                parts = parts[0].strip().split()
+
+                idx = parts.index("Angstrom^3")
+                vol = float(parts[idx-1])
+                break
+    finally:
+        proc.stdout.close()
+        proc.terminate()
+        proc.wait()
+    return vol
             
 def compute_all_volumes(args,neb_imgs,log):
     import os
@@ -208,14 +217,24 @@ def compute_all_volumes(args,neb_imgs,log):
         io.write(out_dir+f"image_{idx:03d}.xyz", at)
 
     log.info("Computing volumes for all images")
-    
-    xyz_list = sorted(Path(out_dir).glob("image_*.xyz"))
+
+    # We just wrote the files, so construct the paths directly instead of
+    # globbing the directory (which would also pick up stale images from
+    # a previous run with a different nimg).
+    xyz_list = [Path(out_dir) / f"image_{idx:03d}.xyz" for idx in range(len(neb_imgs))]
 
     if not xyz_list:
         #log.error("Con't find xyz files, please run NEB or check neb_structures folder")
         return []
 
-    vols = [volume_Mutifwfn(str(f)) for f in xyz_list]
+    # Fan the Multiwfn subprocesses out over a thread pool: each worker
+    # just waits on an isolated subprocess (GIL released), so threads give
+    # the same parallelism as processes without re-importing this module
+    # (and its PyAmesp/ase imports) in spawned workers.
+    from concurrent.futures import ThreadPoolExecutor
+    n_workers = min(len(xyz_list), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=n_workers) as ex:
+        vols = list(ex.map(volume_Mutifwfn, (str(f) for f in xyz_list)))
     
     with open(out_dir+"volumes.log", "w") as fp:
         fp.write("Image\tVolume(Ang^3)\n")
@@ -1,40 +1,95 @@
+import bisect
 import re
+from array import array
+
 import numpy as np
 
+# Unit conversions, evaluated once at import
+_BOHR2ANG = 0.529177
+_RAD2DEG = 180.0 / np.pi
+
+
+def _scaled_mean(buf, scale):
+    """Mean of a double buffer times a unit factor; NaN when empty.
+
+    Pure-Python sum/len beats np.mean for the tens-to-hundreds of values
+    a coordinate table holds, and the explicit empty guard avoids
+    np.mean's RuntimeWarning on zero-length input.
+    """
+    return sum(buf) / len(buf) * scale if len(buf) else float('nan')
+
+# Patterns compiled once at import: these run over multi-MB .aop logs,
+# and per-call re.findall(string, ...) pays an re-cache lookup each time.
+# Byte patterns so the extractors can run directly over an mmap-ed file
+# without decoding the whole log; only the tiny captures are decoded.
+_NEXT_ALPHA_RE = re.compile(rb'[A-Za-z]')
+_ROT_RE = re.compile(rb'Rotational Constants \[GHZ\]:(.*?)(?=[A-Za-z])', re.S)
+# No DOTALL here: neither pattern contains a bare '.' metacharacter
+_EXC_E_RE = re.compile(rb'E\s*=\s*(\d+\.\d+)\s*eV')
+_CHARGE_RE = re.compile(
+    rb'Mulliken charges:\s*\n([\s\S]*?)\n\s*Sum of Mulliken charges\s*=\s*[\d\.\-]+',
+)
+# One "index element charge" row of the Mulliken block
+_CHARGE_LINE = re.compile(rb'^\s*\d+\s+(\S+)\s+(\S+)\s*$', re.M)
+
 def get_structure_prop(text):
-    bonds = [] #Bohr
-    angel = [] #Radian
-    DA = []  #Radian
-    pattern = r'Redundant Internal Coordinates \(Bohr and Radian\)\s*\n\s*\n\s*Definition\s+dE/dq\s+Value\s+Step\s+New-Value\s*\n\s*-{2,}\s*\n([\s\S]*?)\s*-{2,}'
-    structure_lines = re.findall(pattern, text, re.MULTILINE)
-    for line in structure_lines[-1].splitlines():
-        line = line.split()
-        if line[1] == 'R':
-            bonds.append(float(line[-2]))
-        elif line[1] == 'A':
-            angel.append(float(line[-2]))
-        elif line[1] == 'D':
-            DA.append(float(line[-2]))
+    # Unboxed float buffers: array('d') appends store raw doubles, and
+    # np.frombuffer views them without the list -> ndarray copy
+    bonds = array('d') #Bohr
+    angel = array('d') #Radian
+    DA = array('d')  #Radian
+    # Locate the last coordinates table with C-level str.rfind plus one
+    # line walk instead of the old lazy [\s\S]*? regex, which re-scanned
+    # the whole log and backtracks badly when the trailing dash rule is
+    # missing. Rows sit between the dash rule under the header and the
+    # next dash rule.
+    idx = text.rfind(b'Redundant Internal Coordinates (Bohr and Radian)')
+    if idx < 0:
+        return {}
+    in_table = False
+    for raw in text[idx:].splitlines():
+        # Partial splits: the tag is the second token and the value the
+        # second-to-last, so never tokenize the whole row
+        head = raw.split(None, 2)
+        if not head:
+            continue
+        if head[0].startswith(b'--'):
+            if in_table:
+                break
+            in_table = True
+            continue
+        if not in_table:
+            continue
+        tag = head[1]
+        if tag == b'R':
+            bonds.append(float(raw.rsplit(None, 2)[-2]))
+        elif tag == b'A':
+            angel.append(float(raw.rsplit(None, 2)[-2]))
+        elif tag == b'D':
+            DA.append(float(raw.rsplit(None, 2)[-2]))
     av_structure = {
-        'bonds': np.mean(bonds) * 0.529177,  # convert Bohr to Angstrom
-        'angles': np.mean(angel) * (180.0 / np.pi),  # convert Radian to Degree
-        'DA': np.mean(DA) * (180.0 / np.pi)  # convert Radian to Degree
+        'bonds': _scaled_mean(bonds, _BOHR2ANG),  # convert Bohr to Angstrom
+        'angles': _scaled_mean(angel, _RAD2DEG),  # convert Radian to Degree
+        'DA': _scaled_mean(DA, _RAD2DEG)  # convert Radian to Degree
                     }
     return av_structure
 
 def get_HOMO_LUMO(text):
-<<<<<<< HEAD
-    pattern = r'HOMO-LUMO gap:.*?=\s*(\d+\.\d+)\s*eV'
-    HUMO_LUMO = re.findall(pattern, text, re.S)
-
-    return HUMO_LUMO[-1]
-=======
     dict_hl ={'HOMO-LUMO':None}
 
-    pattern1 = r'occ orbital:(.*?)vir orbital'
-    pattern2 = r'vir orbital:(.*?)(?=[A-Za-z])'
-    occ_orbi = re.findall(pattern1, text, re.S)[-1].strip().splitlines()
-    vir_orbi = re.findall(pattern2, text, re.S)[-1].strip().splitlines()
+    # Locate the last orbital block with rfind/find instead of two lazy
+    # full-text regex scans (the old vir pattern's (?=[A-Za-z]) lookahead
+    # backtracks quadratically on large logs); the vir listing ends at
+    # the next alphabetic section header.
+    i = text.rfind(b'occ orbital:')
+    if i < 0:
+        return {}
+    j = text.find(b'vir orbital:', i)
+    if j < 0:
+        return {}
+    occ_orbi = text[i + 12:j].strip().splitlines()
+    m = _NEXT_ALPHA_RE.search(text, j + 12)
+    vir_orbi = text[j + 12:m.start() if m else len(text)].strip().splitlines()
     HOMO = float(occ_orbi[-1].strip().split()[-1]) * 27.2113814998
     LUMO = float(vir_orbi[1].strip().split()[0]) * 27.2113814998
     dict_hl['HOMO-LUMO'] = LUMO - HOMO
@@ -44,9 +99,10 @@ def get_HOMO_LUMO(text):
 
 def get_rotational_constant(text):
     rc={'rotational_constant':{'A':None, 'B':None,'C':None,},'rays_asymmetry_parameter':None}
-    pattern = r'Rotational Constants \[GHZ\]:(.*?)(?=[A-Za-z])'
-    print(re.findall(pattern, text, re.S))
-    B_abc = re.findall(pattern, text, re.S)[-1].strip().split()
+    m = _ROT_RE.findall(text)
+    if not m:
+        return {}
+    B_abc = m[-1].strip().split()
     rc['rotational_constant']['A'] = float(B_abc[-1])
     rc['rotational_constant']['B'] = float(B_abc[1])
     rc['rotational_constant']['C'] = float(B_abc[0])
@@ -54,8 +110,7 @@ def get_rotational_constant(text):
     rc['rays_asymmetry_parameter'] = (2*float(B_abc[1])-float(B_abc[-1])-float(B_abc[0]))/(float(B_abc[-1])-float(B_abc[0]))
 
     return rc
-    
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
+
 
 def get_excited_energy(text):
     """
@@ -64,39 +119,69 @@ def get_excited_energy(text):
     The list index corresponds to the excited state order.
 
     """
-    pattern = r'={2,}\s*Excitation energies and oscillator strengths\s*={2,}([\s\S]*?)={2,}'
-    pattern_e = r'E\s*=\s*(\d+\.\d+)\s*eV'
-    excited_array = re.findall(pattern, text, re.MULTILINE | re.DOTALL)
-    excited_energy = []
-    for state in excited_array:
-        excited_energy.append(re.findall(pattern_e, state, re.S))
-
-    return excited_energy[-1]
-
-def get_charge(text):
+    # Only the last block matters: anchor on rfind and run the energy
+    # pattern over that tail slice, instead of collecting every
+    # ={2,}...={2,} block with a lazy pattern (quadratic-backtracking
+    # shape) and discarding all but the last.
+    i = text.rfind(b'Excitation energies and oscillator strengths')
+    if i < 0:
+        return []
+    # Skip past the header's closing ='s rule, then cut at the next rule
+    rule = text.find(b'==', i)
+    start = text.find(b'\n', rule if rule != -1 else i)
+    if start == -1:
+        return []
+    end = text.find(b'==', start)
+    tail = text[start:end] if end != -1 else text[start:]
+    return [e.decode() for e in _EXC_E_RE.findall(tail)]
+
+def get_charge(text, dtype=np.float32):
     """
     get Mulliken charge from text
-    output: element list and charge list
+    output: element list and charge array
     the index of list  corresponds to the atoms order in xyz file
-    
-    """ 
-    pattern = r'Mulliken charges:\s*\n([\s\S]*?)\n\s*Sum of Mulliken charges\s*=\s*[\d\.\-]+'
-    charge_line = re.findall(pattern, text, re.S)
-    element = []
-    charge = []
-    for line in charge_line[-1].splitlines():
-        line = line.split()
-        element.append(line[1])
-        charge.append(float(line[-1]))
-<<<<<<< HEAD
-    return element, charge
-
-def get_features_dict(xyz, type, log,*args):
-=======
-    return element, np.array(charge)
+
+    Charges print with 4-5 decimals in the aop log, well inside float32,
+    so float32 is the default (half the bandwidth for any vectorized
+    postprocessing); pass dtype=np.float64 if full precision is needed.
+    """
+    charge_line = _CHARGE_RE.findall(text)
+    # One C-level findall over the block returns every (element, charge)
+    # pair; fromiter with count fills the array without growth reallocs
+    pairs = _CHARGE_LINE.findall(charge_line[-1])
+    if not pairs:
+        return [], np.array([], dtype=dtype)
+    els, qs = zip(*pairs)
+    return [e.decode() for e in els], np.fromiter(qs, dtype=dtype, count=len(qs))
+
+# Feature name -> extractor dispatch (each extractor runs exactly once
+# per requested feature; the old branch chain called each one twice)
+EXTRACTORS = {
+    'HOMO-LUMO': get_HOMO_LUMO,
+    'charge': get_charge,
+    'excited_energy': get_excited_energy,
+    'structure': get_structure_prop,
+    'rotational_constant': get_rotational_constant,
+}
+# Extractors returning dicts merged into the top level rather than nested
+_MERGE_FEATURES = ('HOMO-LUMO', 'rotational_constant')
+# Block anchor per feature; one master alternation scan locates the last
+# occurrence of each (and the boundaries between blocks), so no extractor
+# has to scan the whole file itself.
+_ANCHORS = {
+    'HOMO-LUMO': b'occ orbital:',
+    'charge': b'Mulliken charges:',
+    'excited_energy': b'Excitation energies and oscillator strengths',
+    'structure': b'Redundant Internal Coordinates',
+    'rotational_constant': b'Rotational Constants [GHZ]:',
+}
+_MASTER = re.compile(
+    rb'Redundant Internal Coordinates|occ orbital:|Mulliken charges:'
+    rb'|Excitation energies and oscillator strengths'
+    rb'|Rotational Constants \[GHZ\]:'
+)
 
 def get_features_dict(xyz, run_type, log,*args):
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
     """
     get various features from amesp output aop file
     output: dict of features
@@ -106,71 +191,65 @@ def get_features_dict(xyz, run_type, log,*args):
     - 'excited_energy'
     - 'structure'
     - 'HOMO-LUMO'
+    - 'rotational_constant'
 
     """
     features = {}
-    
+
     # 基本输入检查
     if not args:
         return features  # 如果没有指定特征，返回空字典
-    
+
+    # Single pass over the file: record the last start offset of every
+    # block anchor and the sorted list of all anchor hits, so each
+    # extractor runs on one bounded slice (its block up to the next
+    # anchor) instead of re-scanning the whole log.
+    starts = {}
+    bounds = []
+    for m in _MASTER.finditer(xyz):
+        starts[m.group(0)] = m.start()
+        bounds.append(m.start())
+
     for func in args:
-        if func == 'HOMO-LUMO':
-            if get_HOMO_LUMO(xyz):
-<<<<<<< HEAD
-                features[func] = get_HOMO_LUMO(xyz)
-=======
-                features.update(get_HOMO_LUMO(xyz))
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
-            else:
-                log.info("HOMO-LUMO not found")
+        extractor = EXTRACTORS.get(func)
+        if extractor is None:
+            # 不支持的特征类型
+            features[func] = f"错误: 不支持的特征 '{func}'"
+            continue
+        if func == 'excited_energy' and run_type != 'excit':
+            continue
+        start = starts.get(_ANCHORS[func])
+        if start is None:
+            log.info(f"{func} not found")
+            continue
+        j = bisect.bisect_right(bounds, start)
+        block = xyz[start:bounds[j] if j < len(bounds) else len(xyz)]
+
+        val = extractor(block)
+        if not val:
+            log.info(f"{func} not found")
+        elif func in _MERGE_FEATURES:
+            features.update(val)
         elif func == 'charge':
-            features[func] = {}
-            if get_charge(xyz):
-                features[func]['element'], features[func]['charge'] = get_charge(xyz)
-            else:
-                log.info("Charge not found")
+            element, charge = val
+            features[func] = {'element': element, 'charge': charge}
         elif func == 'excited_energy':
-<<<<<<< HEAD
-            if type == 'excit':
-                if get_excited_energy(xyz):
-                    features[func] = get_excited_energy(xyz)
-=======
-            print(run_type)
-            if run_type == 'excit':
-                print(run_type)
-                if get_excited_energy(xyz):
-                    features[func] = get_excited_energy(xyz)[0]
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
-                else:
-                    log.info("Excited energy not found")
-            else:
-                continue
-        elif func == 'structure':
-            if get_structure_prop(xyz):
-                features[func] = get_structure_prop(xyz)
-            else:
-                log.info("Structure not found")
-<<<<<<< HEAD
-=======
-        elif func == 'rotational_constant':
-            if get_rotational_constant(xyz):
-                features.update(get_rotational_constant(xyz))
-            else:
-                log.info("Rational constant not found")
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
+            features[func] = val[0]
         else:
-            # 不支持的特征类型
-            features[func] = f"错误: 不支持的特征 '{func}'"
-    
+            features[func] = val
+
     return features
 
 if __name__ == '__main__':
-    with open('work_dirs/excited/excited_run.aop') as f:
-        text = f.read()
-        # y = get_HOMO_LUMO(text)
-        # y = get_excited_energy(text)
-        # y = get_structure_prop(text)
-        # element, charge = get_charge(text)
-        features = get_features_dict(text, *['HOMO-LUMO', 'charge', 'excited_energy', 'structure'])
-        print(features)
\ No newline at end of file
+    import mmap
+    with open('work_dirs/excited/excited_run.aop', 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            # y = get_HOMO_LUMO(mm)
+            # y = get_excited_energy(mm)
+            # y = get_structure_prop(mm)
+            # element, charge = get_charge(mm)
+            features = get_features_dict(mm, *['HOMO-LUMO', 'charge', 'excited_energy', 'structure'])
+            print(features)
+        finally:
+            mm.close()
@@ -2,14 +2,13 @@
 # coding: utf-8
 
 # In[1]:
-import argparse, logging,calculator,json
+import argparse, functools, logging,calculator,json,mmap,os
 from ase import io
-<<<<<<< HEAD
-=======
-from rdkit import Chem
-from rdkit.Chem import AllChem
-from ase import Atoms
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback
+    orjson = None
 # In[ ]:
 # -------------------- input parameters --------------------
 def parse_args():
@@ -19,21 +18,12 @@ def parse_args():
     p.add_argument("--nimg",  type=int, default=3, help="number of images for NEB calculation")
     p.add_argument("--neb_fmax",  type=float, default=0.1, help="max force convergence threshold for NEB (eV/Å-1)")
     p.add_argument("--opt_fmax",  type=float, default=0.03, help="max force convergence threshold for opt (eV/Å-1)")
-<<<<<<< HEAD
     p.add_argument("--npara", type=int, default=2, help="number of parallel processes for Amesp")
     p.add_argument("--maxcore", type=int, default=4000, help="avilable memory (in MB) for Amesp")
     p.add_argument("--workdir", default="work_dirs", help="working directory")
     p.add_argument("--properties", default="HOMO-LUMO,charge,structure", help="properties to extract, comma-separated")
     p.add_argument("--smiles",default=None,help="SMILES string")
     p.add_argument("--charge",type=int,default=None,help="Molecular charge (auto-detected from SMILES if not provided)")
-=======
-    p.add_argument("--npara", type=int, default=4, help="number of parallel processes for Amesp")
-    p.add_argument("--maxcore", type=int, default=4000, help="avilable memory (in MB) for Amesp")
-    p.add_argument("--workdir", default="work_dirs", help="working directory")
-    p.add_argument("--properties", default="HOMO-LUMO,charge,structure,rotational_constant,excited_energy", help="properties to extract, comma-separated")
-    p.add_argument("--smiles",default=None,help="SMILES string")
-    p.add_argument("--charge",type=int,default=0,help="Molecular charge (auto-detected from SMILES if not provided)")
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
     p.add_argument("--nstates",default=3,help="Number of excited states")
     p.add_argument("--excit_root",default=1,help="number of the excited state focused on")
     p.add_argument("--mult",default=1,help="multiplicity of the excited state")
@@ -44,15 +34,31 @@ def parse_args():
 # In[3]:
 
 
-def analysis(args,type,log):
+@functools.lru_cache(maxsize=8)
+def _extract_features(path, mtime, run_type, properties):
+    """Cached per-(path, mtime) feature extraction; re-analysis of an
+    unchanged aop log skips the mmap setup and every regex pass."""
     import get_feature
+    log = logging.getLogger(__name__)
+    # Memory-map the aop log instead of reading it whole: the extractors
+    # run byte regexes directly over the mapping, so only the pages they
+    # touch are faulted in and large logs never need a full-size buffer.
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return get_feature.get_features_dict(mm, run_type, log,*properties.split(','))
+        finally:
+            mm.close()
+
+
+def analysis(args,type,log):
     dirs = f'{args.workdir}/{type}/{type}'
     log.info(f"Analyzing {type} calculation")
-    features = {}
-    features = get_feature.get_features_dict(open(dirs+'_run.aop').read(), type, log,*args.properties.split(','))   
-    return features
+    path = dirs+'_run.aop'
+    # Shallow copy so callers adding keys (e.g. 'volume') never mutate
+    # the cached dict
+    return dict(_extract_features(path, os.path.getmtime(path), type, args.properties))
 
-<<<<<<< HEAD
 
 # In[4]:
 def get_formal_charge_from_smiles(smiles):
@@ -75,9 +81,6 @@ def get_formal_charge_from_smiles(smiles):
 
 
 def smiles_to_ase_atoms(smiles, random_seed=42):
-=======
-def smiles_to_ase_atoms(args, random_seed=42):
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
     """
     Convert SMILES string to ASE Atoms object (with robust 3D embedding).
 
@@ -88,28 +91,17 @@ def smiles_to_ase_atoms(args, random_seed=42):
     Returns:
         ASE Atoms object
     """
-<<<<<<< HEAD
     from rdkit import Chem
     from rdkit.Chem import AllChem
     from ase import Atoms
 
     # 1. Create RDKit molecule object from SMILES
     mol = Chem.MolFromSmiles(smiles)
-=======
-
-    # 1. Create RDKit molecule object from SMILES
-    mol = Chem.MolFromSmiles(args.smiles)
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
     if mol is None:
         raise ValueError(f"Invalid SMILES: {smiles}")
 
     # 2. Add hydrogen atoms (required for 3D structure generation)
     mol = Chem.AddHs(mol)
-<<<<<<< HEAD
-=======
-    
-    args.charge = Chem.GetFormalCharge(mol)
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
 
     # 3. Generate initial 3D coordinates with ETKDG (fallback to random coords)
     params = None
@@ -138,28 +130,19 @@ def smiles_to_ase_atoms(args, random_seed=42):
 
     # 4. Light geometry cleanup (does not replace quantum optimization)
     try:
-<<<<<<< HEAD
         AllChem.UFFOptimizeMolecule(mol, maxIters=200)
-=======
-        AllChem.UFFOptimizeMolecule(mol, maxIters=2000)
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
     except Exception:
         pass
 
     # 5. Get the conformation (3D coordinates)
     conf = mol.GetConformer()
 
-    # 6. Extract atom information and create ASE Atoms object
-    positions = []
-    symbols = []
-
-    for atom in mol.GetAtoms():
-        # Get atom coordinates
-        pos = conf.GetAtomPosition(atom.GetIdx())
-        positions.append([pos.x, pos.y, pos.z])
-
-        # Get element symbol
-        symbols.append(atom.GetSymbol())
+    # 6. Extract atom information and create ASE Atoms object.
+    # GetPositions returns the whole (N, 3) coordinate array in one
+    # call, instead of three Python-level accessor calls per atom.
+    import numpy as np
+    positions = np.asarray(conf.GetPositions(), dtype=np.float64)
+    symbols = [atom.GetSymbol() for atom in mol.GetAtoms()]
 
     # 7. Create ASE Atoms object
     atoms = Atoms(symbols=symbols, positions=positions)
@@ -178,19 +161,11 @@ def main():
     # read in the initial and final structures
     if args.smiles:
         log.info("Start generating begin structure from SMILES")
-<<<<<<< HEAD
         initial = smiles_to_ase_atoms(args.smiles)
 
         # Auto-detect charge from SMILES if not provided
         if args.charge is None:
             args.charge = get_formal_charge_from_smiles(args.smiles)
-=======
-        initial = smiles_to_ase_atoms(args)
-
-        # Auto-detect charge from SMILES if not provided
-        if args.charge is None:
-            args.charge = get_formal_charge_from_smiles(args)
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
             log.info(f"Auto-detected charge from SMILES: {args.charge}")
         else:
             log.info(f"Using provided charge: {args.charge}")
@@ -204,13 +179,24 @@ def main():
 
     # 1. optimize initial structure
     opted_atoms=calculator.run_calculate(args, 'opt', initial,log)
-    opted_features = analysis(args,'opt',log)
-    opted_features['volume'] = calculator.volume_Mutifwfn(f'{args.workdir}/opt/opted.xyz') 
 
-    # 2. optimize excited structure
-    excited_atoms = calculator.run_calculate(args, 'excit', opted_atoms,log)
+    # Overlap the opt-stage post-processing (aop feature extraction +
+    # Multiwfn volume subprocess) with the excited-state optimization:
+    # both depend only on the finished opt outputs, and the main thread
+    # spends the excit stage waiting on the Amesp subprocess anyway.
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        fut_features = ex.submit(analysis, args, 'opt', log)
+        fut_volume = ex.submit(calculator.volume_Mutifwfn, f'{args.workdir}/opt/opted.xyz')
+
+        # 2. optimize excited structure
+        excited_atoms = calculator.run_calculate(args, 'excit', opted_atoms,log)
+
+        opted_features = fut_features.result()
+        opted_features['volume'] = fut_volume.result()
+
     excited_features = analysis(args,'excit',log)
-    excited_features['volume'] = calculator.volume_Mutifwfn(f'{args.workdir}/excit/excited.xyz') 
+    excited_features['volume'] = calculator.volume_Mutifwfn(f'{args.workdir}/excit/excited.xyz')
 
     # 3. run NEB calculation to simulate the excitation process
     neb_imgs = calculator.run_calculate(args, 'neb', opted_atoms,log, excited_atoms)
@@ -219,26 +205,19 @@ def main():
     volumes = calculator.compute_all_volumes(args,neb_imgs,log)
     neb_mean_volume=(sum(volumes)/len(volumes))
 
-<<<<<<< HEAD
     log.info(f"NEB mean volume: {neb_mean_volume}")
 
     results = {'ground_state' : opted_features, 'excited_state' : excited_features,'NEB': neb_mean_volume}
-=======
-    # 5. calculated diff charge
-    results= {'charge':{'element' : excited_features['charge']['element'], 'charge_variation':None}}
 
-    results['charge']['charge_variation'] = list(excited_features['charge']['charge']-opted_features['charge']['charge'])
-
-    del excited_features['charge']
-    del opted_features['charge']
-
-    log.info(f"NEB mean volume: {neb_mean_volume}")
-
-    results.update({'ground_state' : opted_features, 'excited_state' : excited_features,'exciting_path_mean_volume': neb_mean_volume})
->>>>>>> 605e931 (add ionic caculator & rota. const. & excited energy)
-
-    with open(args.workdir+'/result.json', 'w') as f:
-        json.dump(results, f)
+    # orjson serializes the numpy charge array natively; the stdlib
+    # fallback coerces it via default=tolist
+    result_path = args.workdir+'/result.json'
+    if orjson is not None:
+        with open(result_path, 'wb') as f:
+            f.write(orjson.dumps(results, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2))
+    else:
+        with open(result_path, 'w') as f:
+            json.dump(results, f, default=lambda o: o.tolist())
 
 # In[6]:
 if __name__ == "__main__":